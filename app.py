@@ -2,40 +2,230 @@
 Smart Weather App - Flask Application
 Main web application for agriculture and travel weather recommendations
 """
-from flask import Flask, render_template, request, jsonify, session
-from weather_service import WeatherService
+from flask import Flask, render_template, request, jsonify
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+from weather_service import CurrentWeather, WeatherService
 from location_service import LocationService
 from recommendations import RecommendationEngine
 from visualizations import WeatherVisualizer
-from config import Config
-import traceback
+from cache import ResponseCache, coord_key, json_dumps
+from config import CONFIG
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import atexit
+import gzip
+import hashlib
+import math
+import logging
+import logging.handlers
+import queue
+import threading
+import zlib
+import orjson
+
+
+def _configure_logging():
+    """
+    Create the app logger
+    
+    Records are handed to a QueueListener thread, so request threads never
+    block on writing to stdout/stderr.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    app_logger = logging.getLogger(__name__)
+    app_logger.setLevel(logging.INFO)
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.propagate = False
+    return app_logger
+
+
+logger = _configure_logging()
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that encodes jsonify() responses with orjson"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return json_dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Skip the str round trip: hand orjson's bytes straight to the response
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_dumps(obj), mimetype='application/json')
+
 
 app = Flask(__name__)
-app.secret_key = Config.FLASK_SECRET_KEY
+app.json = OrjsonProvider(app)
+# gzip/br for JSON and page responses (pre-compressed chart bodies pass through)
+Compress(app)
 
 # Initialize services
 weather_service = WeatherService()
 location_service = LocationService()
 recommendation_engine = RecommendationEngine()
 visualizer = WeatherVisualizer()
+cache = ResponseCache()
+
+# Shared pool for blocking upstream calls, so the independent HTTP round trips
+# made by a single request overlap instead of adding up
+io_executor = ThreadPoolExecutor(max_workers=CONFIG.IO_WORKERS, thread_name_prefix='upstream')
+
+
+def _valid_coordinates(lat, lon):
+    """True if lat/lon are present, finite and within the geographic range"""
+    return (lat is not None and lon is not None
+            and math.isfinite(lat) and math.isfinite(lon)
+            and abs(lat) <= 90 and abs(lon) <= 180)
+
+
+def _gather(*calls):
+    """
+    Run independent blocking calls concurrently on the upstream pool
+    
+    Args:
+        calls: Tuples of (function, *args)
+        
+    Returns:
+        List of results in the same order as the calls
+    """
+    futures = [io_executor.submit(func, *args) for func, *args in calls]
+    return [future.result() for future in futures]
+
+
+def _as_current_weather(weather):
+    """CurrentWeather from a fresh result or its JSON-decoded cache entry"""
+    return weather if isinstance(weather, CurrentWeather) else CurrentWeather(**weather)
+
+
+def _cached_current_weather(lat, lon):
+    """Current weather for coordinates, served from cache when fresh"""
+    key = f"wx:v5:current:{coord_key(lat, lon)}"
+    fetch = (weather_service.get_current_weather_batched if CONFIG.OWM_BATCH_WINDOW_MS
+             else weather_service.get_current_weather)
+    return _as_current_weather(cache.get_or_compute(key, CONFIG.CACHE_TTLS['current_weather'], fetch, lat, lon))
+
+
+def _cached_weather_by_city(city):
+    """Current weather for a city name, served from cache when fresh"""
+    key = f"wx:v5:city:{city.strip().lower()}"
+    return _as_current_weather(cache.get_or_compute(key, CONFIG.CACHE_TTLS['current_weather'],
+                                                    weather_service.get_weather_by_city, city))
+
+
+def _cached_forecast(lat, lon, days):
+    """Daily forecast for coordinates, served from cache when fresh"""
+    key = f"wx:v2:forecast:{coord_key(lat, lon)}:{days}"
+    forecast = cache.get_or_compute(key, CONFIG.CACHE_TTLS['forecast'],
+                                    weather_service.get_forecast, lat, lon, days)
+    # Cached days carry their date as an ISO string
+    for day in forecast:
+        if isinstance(day['date'], str):
+            day['date'] = date.fromisoformat(day['date'])
+    return forecast
+
+
+def _cached_city_by_coordinates(lat, lon):
+    """Reverse geocoded location details, served from cache when known"""
+    key = f"geo:rev:{coord_key(lat, lon, 1000)}"
+    return cache.get_or_compute(key, CONFIG.CACHE_TTLS['reverse_geocode'],
+                                location_service.get_city_by_coordinates, lat, lon)
+
+
+def _chart_response(chart_type, lat, lon, forecast, render):
+    """
+    JSON plotly figure response for a forecast, rendered only when not already cached
+    
+    The key includes a digest of the forecast, so charts refresh as soon as
+    the underlying forecast changes. The whole response body is cached
+    gzip-compressed and sent as-is to clients that accept gzip.
+    """
+    digest = hashlib.blake2s(orjson.dumps(forecast, option=orjson.OPT_NON_STR_KEYS), digest_size=8).hexdigest()
+    key = f"chart:fig:gz2:{chart_type}:{coord_key(lat, lon)}:{digest}"
+    
+    body = cache.get_bytes(key)
+    if body is None:
+        # The figure is already JSON - embed it as-is rather than as a string
+        chart = orjson.Fragment(render(forecast, format='json'))
+        body = gzip.compress(orjson.dumps({'success': True, 'chart': chart}), compresslevel=6)
+        cache.set_bytes(key, body, CONFIG.CACHE_TTLS['chart'])
+    
+    if request.accept_encodings['gzip']:
+        response = app.response_class(body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        # Stream the decompressed body instead of inflating it all in memory
+        response = app.response_class(_gunzip_chunks(body), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _gunzip_chunks(body, chunk_size=64 * 1024):
+    """Yield the decompressed contents of a gzip body in bounded chunks"""
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    data = body
+    while data:
+        chunk = decompressor.decompress(data, chunk_size)
+        if chunk:
+            yield chunk
+        data = decompressor.unconsumed_tail
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def _cached_location_by_ip(ip):
+    """IP based location, served from cache when known"""
+    key = f"geo:ip:{ip}"
+    return cache.get_or_compute(key, CONFIG.CACHE_TTLS['ip_location'],
+                                location_service.get_location_by_ip, ip)
+
+
+# Rendered page bodies for templates that take no context
+_rendered_pages = {}
+
+
+def _static_page(template):
+    """
+    Serve a context-free template
+    
+    The page is rendered on its first request and the bytes are reused
+    afterwards (debug mode re-renders so template edits show up).
+    """
+    if app.debug:
+        return render_template(template)
+    
+    body = _rendered_pages.get(template)
+    if body is None:
+        body = _rendered_pages[template] = render_template(template).encode()
+    return app.response_class(body, mimetype='text/html')
 
 
 @app.route('/')
 def index():
     """Home page"""
-    return render_template('index.html')
+    return _static_page('index.html')
 
 
 @app.route('/agriculture')
 def agriculture():
     """Agriculture mode page"""
-    return render_template('agriculture.html')
+    return _static_page('agriculture.html')
 
 
 @app.route('/travel')
 def travel():
     """Travel mode page"""
-    return render_template('travel.html')
+    return _static_page('travel.html')
 
 
 @app.route('/test-charts')
@@ -48,7 +238,7 @@ def test_charts():
 def auto_detect_location():
     """Auto-detect user location by IP"""
     try:
-        location = location_service.get_location_by_ip()
+        location = _cached_location_by_ip(request.remote_addr)
         if not location:
             location = location_service.get_default_location()
         
@@ -67,6 +257,8 @@ def auto_detect_location():
 def search_location():
     """Search for locations"""
     query = request.args.get('q', '')
+    include_raw = request.args.get('raw', 'false').lower() == 'true'
+    columnar = request.args.get('format') == 'columnar'
     
     if not query:
         return jsonify({
@@ -75,7 +267,9 @@ def search_location():
         }), 400
     
     try:
-        locations = location_service.search_locations(query)
+        locations = location_service.search_locations(query, include_raw=include_raw)
+        if columnar:
+            locations = location_service.to_columns(locations)
         return jsonify({
             'success': True,
             'locations': locations
@@ -94,36 +288,99 @@ def get_current_weather():
     lon = request.args.get('lon', type=float)
     city = request.args.get('city')
     
+    if (lat is not None or lon is not None) and not _valid_coordinates(lat, lon):
+        return jsonify({
+            'success': False,
+            'error': 'lat and lon must be finite, with |lat| <= 90 and |lon| <= 180'
+        }), 400
+    
     try:
         if lat is not None and lon is not None:
-            weather = weather_service.get_current_weather(lat, lon)
+            # Weather and reverse geocoding only depend on the coordinates
+            weather, location_info = _gather(
+                (_cached_current_weather, lat, lon),
+                (_cached_city_by_coordinates, lat, lon)
+            )
+            if location_info:
+                weather['city'] = location_info['city']
+                weather['country'] = location_info.get('country_code', weather.get('country', ''))
         elif city:
-            weather = weather_service.get_weather_by_city(city)
+            weather = _cached_weather_by_city(city)
         else:
             return jsonify({
                 'success': False,
                 'error': 'Either lat/lon or city parameter required'
             }), 400
         
-        # Get location details if coordinates provided
-        if lat is not None and lon is not None:
-            location_info = location_service.get_city_by_coordinates(lat, lon)
-            if location_info:
-                weather['city'] = location_info['city']
-                weather['country'] = location_info.get('country_code', weather.get('country', ''))
-        
         return jsonify({
             'success': True,
             'weather': weather
         })
     except Exception as e:
-        print(f"Error fetching weather: {traceback.format_exc()}")
+        logger.exception("Error fetching weather")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
+@app.route('/api/weather/batch', methods=['POST'])
+def get_batch_weather():
+    """Get current weather for several locations in one request"""
+    payload = request.get_json(silent=True) or {}
+    points = payload.get('points')
+    
+    if not isinstance(points, list) or not points:
+        return jsonify({
+            'success': False,
+            'error': 'JSON body with a non-empty "points" list required'
+        }), 400
+    
+    if len(points) > CONFIG.BATCH_MAX_POINTS:
+        return jsonify({
+            'success': False,
+            'error': f'At most {CONFIG.BATCH_MAX_POINTS} points per batch'
+        }), 400
+    
+    coordinates = []
+    for point in points:
+        try:
+            lat, lon = float(point['lat']), float(point['lon'])
+            if not _valid_coordinates(lat, lon):
+                raise ValueError(f"coordinates out of range: {lat}, {lon}")
+            coordinates.append((lat, lon))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'Each point requires finite numeric lat (|lat| <= 90) and lon (|lon| <= 180)'
+            }), 400
+    
+    # Fetch each distinct location once, with a bounded number in flight
+    # so a large batch cannot flood the OpenWeather rate limit
+    slots = threading.BoundedSemaphore(CONFIG.BATCH_CONCURRENCY)
+    futures = {}
+    for lat, lon in coordinates:
+        key = coord_key(lat, lon)
+        if key not in futures:
+            slots.acquire()
+            future = io_executor.submit(_cached_current_weather, lat, lon)
+            future.add_done_callback(lambda _: slots.release())
+            futures[key] = future
+    
+    results = []
+    for lat, lon in coordinates:
+        future = futures[coord_key(lat, lon)]
+        try:
+            results.append({'success': True, 'weather': future.result()})
+        except Exception as e:
+            results.append({'success': False, 'error': str(e)})
+    
+    return jsonify({
+        'success': True,
+        'results': results
+    })
+
+
 @app.route('/api/weather/forecast')
 def get_forecast():
     """Get weather forecast"""
@@ -131,20 +388,26 @@ def get_forecast():
     lon = request.args.get('lon', type=float)
     days = request.args.get('days', default=5, type=int)
     
-    if lat is None or lon is None:
+    if not _valid_coordinates(lat, lon):
         return jsonify({
             'success': False,
-            'error': 'lat and lon parameters required'
+            'error': 'lat and lon parameters required (finite, |lat| <= 90, |lon| <= 180)'
+        }), 400
+    
+    if days < 0:
+        return jsonify({
+            'success': False,
+            'error': 'days must be a non-negative integer'
         }), 400
     
     try:
-        forecast = weather_service.get_forecast(lat, lon, days)
+        forecast = _cached_forecast(lat, lon, days)
         return jsonify({
             'success': True,
             'forecast': forecast
         })
     except Exception as e:
-        print(f"Error fetching forecast: {traceback.format_exc()}")
+        logger.exception("Error fetching forecast")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -157,16 +420,18 @@ def get_agriculture_recommendations():
     lat = request.args.get('lat', type=float)
     lon = request.args.get('lon', type=float)
     
-    if lat is None or lon is None:
+    if not _valid_coordinates(lat, lon):
         return jsonify({
             'success': False,
-            'error': 'lat and lon parameters required'
+            'error': 'lat and lon parameters required (finite, |lat| <= 90, |lon| <= 180)'
         }), 400
     
     try:
-        # Get current weather and forecast
-        weather = weather_service.get_current_weather(lat, lon)
-        forecast = weather_service.get_forecast(lat, lon, 5)
+        # Get current weather and forecast concurrently
+        weather, forecast = _gather(
+            (_cached_current_weather, lat, lon),
+            (_cached_forecast, lat, lon, 5)
+        )
         
         # Generate recommendations
         recommendations = recommendation_engine.get_agriculture_recommendations(weather, forecast)
@@ -178,7 +443,7 @@ def get_agriculture_recommendations():
             'recommendations': recommendations
         })
     except Exception as e:
-        print(f"Error generating agriculture recommendations: {traceback.format_exc()}")
+        logger.exception("Error generating agriculture recommendations")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -191,16 +456,18 @@ def get_travel_recommendations():
     lat = request.args.get('lat', type=float)
     lon = request.args.get('lon', type=float)
     
-    if lat is None or lon is None:
+    if not _valid_coordinates(lat, lon):
         return jsonify({
             'success': False,
-            'error': 'lat and lon parameters required'
+            'error': 'lat and lon parameters required (finite, |lat| <= 90, |lon| <= 180)'
         }), 400
     
     try:
-        # Get current weather and forecast
-        weather = weather_service.get_current_weather(lat, lon)
-        forecast = weather_service.get_forecast(lat, lon, 5)
+        # Get current weather and forecast concurrently
+        weather, forecast = _gather(
+            (_cached_current_weather, lat, lon),
+            (_cached_forecast, lat, lon, 5)
+        )
         
         # Generate recommendations
         recommendations = recommendation_engine.get_travel_recommendations(weather, forecast)
@@ -212,7 +479,7 @@ def get_travel_recommendations():
             'recommendations': recommendations
         })
     except Exception as e:
-        print(f"Error generating travel recommendations: {traceback.format_exc()}")
+        logger.exception("Error generating travel recommendations")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -225,26 +492,17 @@ def get_temperature_chart():
     lat = request.args.get('lat', type=float)
     lon = request.args.get('lon', type=float)
     
-    if lat is None or lon is None:
+    if not _valid_coordinates(lat, lon):
         return jsonify({
             'success': False,
-            'error': 'lat and lon parameters required'
+            'error': 'lat and lon parameters required (finite, |lat| <= 90, |lon| <= 180)'
         }), 400
     
     try:
-        print(f"Fetching temperature chart for lat={lat}, lon={lon}")
-        forecast = weather_service.get_forecast(lat, lon, 7)
-        print(f"Got forecast with {len(forecast)} days")
-        
-        chart_html = visualizer.create_temperature_chart(forecast, format='html')
-        print(f"Generated chart HTML, length: {len(chart_html)}")
-        
-        return jsonify({
-            'success': True,
-            'chart': chart_html
-        })
+        forecast = _cached_forecast(lat, lon, 7)
+        return _chart_response('temperature', lat, lon, forecast, visualizer.create_temperature_chart)
     except Exception as e:
-        print(f"Error creating temperature chart: {traceback.format_exc()}")
+        logger.exception("Error creating temperature chart")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -257,26 +515,17 @@ def get_rainfall_chart():
     lat = request.args.get('lat', type=float)
     lon = request.args.get('lon', type=float)
     
-    if lat is None or lon is None:
+    if not _valid_coordinates(lat, lon):
         return jsonify({
             'success': False,
-            'error': 'lat and lon parameters required'
+            'error': 'lat and lon parameters required (finite, |lat| <= 90, |lon| <= 180)'
         }), 400
     
     try:
-        print(f"Fetching rainfall chart for lat={lat}, lon={lon}")
-        forecast = weather_service.get_forecast(lat, lon, 7)
-        print(f"Got forecast with {len(forecast)} days")
-        
-        chart_html = visualizer.create_rainfall_chart(forecast, format='html')
-        print(f"Generated chart HTML, length: {len(chart_html)}")
-        
-        return jsonify({
-            'success': True,
-            'chart': chart_html
-        })
+        forecast = _cached_forecast(lat, lon, 7)
+        return _chart_response('rainfall', lat, lon, forecast, visualizer.create_rainfall_chart)
     except Exception as e:
-        print(f"Error creating rainfall chart: {traceback.format_exc()}")
+        logger.exception("Error creating rainfall chart")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -296,4 +545,5 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    app.run(host=Config.HOST, port=Config.PORT, debug=Config.DEBUG)
+    # Development server only - see Config for the production command
+    app.run(host=CONFIG.HOST, port=CONFIG.PORT, debug=CONFIG.DEBUG, threaded=True)
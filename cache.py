@@ -0,0 +1,216 @@
+"""
+Response Cache Module
+Caches upstream API results in Redis, with an in-process fallback
+"""
+import copy
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+import orjson
+from config import CONFIG
+
+try:
+    import redis
+except ImportError:  # Redis is optional - fall back to the in-process cache
+    redis = None
+
+
+def coord_key(lat: float, lon: float, scale: int = 100) -> str:
+    """
+    Quantize coordinates into a grid cell key
+
+    Nearby points (GPS noise, neighbouring users) map to the same key, so
+    they share cache entries and in-flight requests. The default scale of
+    100 gives 0.01 degree cells, about 1.1 km.
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        scale: Cells per degree
+
+    Returns:
+        Key of the form "<lat cell>:<lon cell>"
+    """
+    return f"{math.floor(lat * scale)}:{math.floor(lon * scale)}"
+
+
+class MemoryCache:
+    """Thread-safe in-process TTL cache with LRU eviction"""
+
+    def __init__(self, maxsize: int = 1024):
+        """Initialize an empty cache holding at most `maxsize` entries"""
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        """Store value under key for ttl seconds"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def json_dumps(value: Any) -> bytes:
+    """Encode value as JSON the way cached values and API responses are encoded"""
+    # orjson handles dataclasses (CurrentWeather), dates and numpy natively
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ResponseCache:
+    """Get-or-compute cache for upstream API results"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Uses Redis when a URL is configured and the client is installed,
+        otherwise keeps entries in process memory.
+        """
+        self._redis = None
+        self._memory = MemoryCache()
+
+        redis_url = redis_url or CONFIG.REDIS_URL
+        if redis_url:
+            if redis is None:
+                print("WARNING: REDIS_URL is set but the redis package is not installed. Using in-memory cache")
+            else:
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+
+    def get(self, key: str) -> Any:
+        """
+        Return the cached value for key, or None on a miss
+
+        Values come back as plain JSON types: dates and datetimes are ISO
+        strings and objects are dicts, so callers restore richer types
+        themselves. Every hit is a fresh copy the caller may mutate.
+        """
+        raw = self._get_raw(key)
+        if raw is None:
+            return None
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Not ours (e.g. left over from an older encoding) - treat as a miss
+            return None
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Cache value under key for ttl seconds, JSON-encoded"""
+        # JSON rather than pickle: whoever can write to a shared Redis must
+        # not be able to run code in the web workers
+        self._set_raw(key, json_dumps(value), ttl)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Return the opaque bytes cached under key, or None on a miss"""
+        return self._get_raw(key)
+
+    def set_bytes(self, key: str, body: bytes, ttl: float):
+        """Cache opaque bytes (e.g. a compressed response body) for ttl seconds"""
+        self._set_raw(key, body, ttl)
+
+    def get_or_compute(self, key: str, ttl: float, func: Callable, *args, **kwargs) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss
+
+        Args:
+            key: Cache key
+            ttl: Time to live in seconds
+            func: Function producing the value on a miss
+
+        Returns:
+            Cached or freshly computed value (None results are not cached)
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = func(*args, **kwargs)
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        if self._redis is not None:
+            try:
+                return self._redis.get(key)
+            except redis.RedisError as e:
+                print(f"Redis read failed, using in-memory cache: {str(e)}")
+        return self._memory.get(key)
+
+    def _set_raw(self, key: str, raw: bytes, ttl: float):
+        if self._redis is not None:
+            try:
+                self._redis.setex(key, int(ttl), raw)
+                return
+            except redis.RedisError as e:
+                print(f"Redis write failed, using in-memory cache: {str(e)}")
+        self._memory.set(key, raw, ttl)
+
+
+class _Call:
+    """An in-flight SingleFlight call"""
+    __slots__ = ('future', 'waiters')
+
+    def __init__(self):
+        self.future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into a single execution"""
+
+    def __init__(self):
+        """Initialize with no calls in flight"""
+        self._inflight: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func once per key at a time
+
+        Callers arriving while a call for the same key is in flight wait for
+        it and receive a copy of its result (or its exception) instead of
+        issuing a duplicate upstream request.
+        """
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            return copy.deepcopy(call.future.result())
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            call.future.set_exception(e)
+            raise
+        else:
+            call.future.set_result(result)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+        # Waiters copy the stored result, so the leader must not hand out
+        # the same object for its caller to mutate
+        return copy.deepcopy(result) if call.waiters else result
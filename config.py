@@ -2,46 +2,109 @@
 Configuration module for Weather App
 """
 import os
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+
+def _frozen(mapping: dict):
+    """Dataclass field holding a read-only copy of mapping"""
+    return field(default_factory=lambda: MappingProxyType(dict(mapping)))
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Application configuration"""
+    """
+    Application configuration
+    
+    Frozen and slotted, instantiated once as CONFIG - read settings from that
+    instance rather than from the class.
+    
+    `python app.py` runs the threaded Flask development server. In production
+    serve the WSGI app with several workers, e.g.:
+        gunicorn -w $(nproc) --threads 8 -b 0.0.0.0:5000 app:app
+    """
     
     # API Keys
-    OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY', '')
-    IPINFO_API_KEY = os.getenv('IPINFO_API_KEY', '')
+    OPENWEATHER_API_KEY: str = os.getenv('OPENWEATHER_API_KEY', '')
+    IPINFO_API_KEY: str = os.getenv('IPINFO_API_KEY', '')
+    
+    # Cache (optional Redis backend, in-memory fallback when unset)
+    REDIS_URL: str = os.getenv('REDIS_URL', '')
+    CACHE_TTLS: Mapping[str, float] = _frozen({
+        'current_weather': 600,           # s - OpenWeather updates ~10 min
+        'forecast': 1800,                 # s
+        'air_quality': 600,               # s
+        'reverse_geocode': 30 * 86400,    # s - effectively static per coordinate
+        'ip_location': 86400,             # s
+        'chart': 1800,                    # s
+    })
+    
+    # Offline IP -> location table (db-ip.com "IP to City Lite" CSV, optionally .gz)
+    IP_LOCATION_DB: str = os.getenv('IP_LOCATION_DB', '')
+    
+    # Offline reverse geocoding (GeoNames cities file, e.g. cities15000.txt, optionally .gz)
+    CITIES_DB: str = os.getenv('CITIES_DB', '')
+    REVERSE_GEOCODE_MAX_KM: float = float(os.getenv('REVERSE_GEOCODE_MAX_KM', 50))
     
     # API Endpoints
-    OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5"
-    OPENWEATHER_FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
-    OPENWEATHER_ONECALL_URL = "https://api.openweathermap.org/data/3.0/onecall"
+    OPENWEATHER_BASE_URL: str = "https://api.openweathermap.org/data/2.5"
+    OPENWEATHER_FORECAST_URL: str = "https://api.openweathermap.org/data/2.5/forecast"
+    OPENWEATHER_ONECALL_URL: str = "https://api.openweathermap.org/data/3.0/onecall"
+    NOMINATIM_URL: str = "https://nominatim.openstreetmap.org"
+    NOMINATIM_MIN_INTERVAL: float = 1.0   # s - Nominatim allows at most 1 request/second
     
     # App Settings
-    FLASK_SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
-    DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
-    HOST = os.getenv('HOST', '0.0.0.0')
-    PORT = int(os.getenv('PORT', 5000))
+    DEBUG: bool = os.getenv('DEBUG', 'True').lower() == 'true'
+    HOST: str = os.getenv('HOST', '0.0.0.0')
+    PORT: int = int(os.getenv('PORT', 5000))
+    
+    # Worker threads for concurrent upstream API calls
+    IO_WORKERS: int = int(os.getenv('IO_WORKERS', 32))
+    OWM_MAX_CONCURRENCY: int = int(os.getenv('OWM_MAX_CONCURRENCY', 10))
+    # (connect, read) timeouts in seconds for every upstream HTTP call
+    UPSTREAM_TIMEOUT: Tuple[float, float] = (
+        float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', 1)),
+        float(os.getenv('UPSTREAM_READ_TIMEOUT', 5)),
+    )
+    # Largest decoded OpenWeatherMap response body accepted, in bytes
+    OWM_MAX_RESPONSE_BYTES: int = int(os.getenv('OWM_MAX_RESPONSE_BYTES', 256_000))
+    
+    # Batch weather endpoint limits
+    BATCH_MAX_POINTS: int = int(os.getenv('BATCH_MAX_POINTS', 50))
+    BATCH_CONCURRENCY: int = int(os.getenv('BATCH_CONCURRENCY', 20))
+    
+    # Micro-batching window for current weather lookups (0 disables)
+    OWM_BATCH_WINDOW_MS: int = int(os.getenv('OWM_BATCH_WINDOW_MS', 0))
+    OWM_BATCH_MAX_SIZE: int = int(os.getenv('OWM_BATCH_MAX_SIZE', 20))
+    
+    # Server-side matplotlib PNG charts (the web pages only use plotly figures)
+    ENABLE_PNG_CHARTS: bool = os.getenv('WEATHER_ENABLE_PNG', '0') == '1'
     
     # Weather thresholds for agriculture
-    AGRICULTURE_THRESHOLDS = {
+    AGRICULTURE_THRESHOLDS: Mapping[str, float] = _frozen({
         'wind_speed_spray': 20,  # km/h - max wind for pesticide spraying
         'rain_threshold': 10,     # mm - significant rainfall
         'frost_temp': 2,          # °C - frost warning
         'heat_stress': 35,        # °C - heat stress for crops
         'high_humidity': 80,      # % - disease risk
-    }
+    })
     
     # Travel recommendations thresholds
-    TRAVEL_THRESHOLDS = {
+    TRAVEL_THRESHOLDS: Mapping[str, float] = _frozen({
         'cold_weather': 10,       # °C
         'hot_weather': 30,        # °C
         'rain_warning': 5,        # mm
         'wind_warning': 40,       # km/h
-    }
+    })
     
     # Supported languages
-    SUPPORTED_LANGUAGES = ['en', 'hi', 'es', 'fr']
-    DEFAULT_LANGUAGE = 'en'
+    SUPPORTED_LANGUAGES: Tuple[str, ...] = ('en', 'hi', 'es', 'fr')
+    DEFAULT_LANGUAGE: str = 'en'
+
+
+CONFIG = Config()
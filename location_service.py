@@ -2,34 +2,116 @@
 Location Detection Module
 Handles location detection via IP and GPS coordinates
 """
+import ipaddress
+import threading
+import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional, Tuple
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-from geopy.location import Location
-from config import Config
+from cache import SingleFlight, coord_key
+from offline_geo import CityIndex, IPLocationTable
+from config import CONFIG
+
+
+# Nominatim's usage policy requires an identifying User-Agent
+NOMINATIM_HEADERS = {'User-Agent': 'smart_weather_app'}
 
 
 class LocationService:
     """Service for location detection and geocoding"""
     
+    __slots__ = ('ipinfo_key', '_session', '_inflight', '_nominatim_lock', '_nominatim_last',
+                 'ip_table', 'city_index')
+    
     def __init__(self):
         """Initialize location service"""
-        self.geolocator = Nominatim(user_agent="smart_weather_app")
-        self.ipinfo_key = Config.IPINFO_API_KEY
+        self.ipinfo_key = CONFIG.IPINFO_API_KEY
+        
+        # Pooled keep-alive connections, reused across calls
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        # Identical concurrent lookups share one upstream call
+        self._inflight = SingleFlight()
+        
+        # Serializes Nominatim calls to its rate limit
+        self._nominatim_lock = threading.Lock()
+        self._nominatim_last = 0.0
+        
+        # Optional offline IP range table, used before falling back to ip-api.com
+        self.ip_table = None
+        if CONFIG.IP_LOCATION_DB:
+            try:
+                self.ip_table = IPLocationTable(CONFIG.IP_LOCATION_DB)
+                print(f"Loaded {len(self.ip_table)} IP ranges from {CONFIG.IP_LOCATION_DB}")
+            except OSError as e:
+                print(f"Failed to load IP location database: {str(e)}")
+        
+        # Optional offline city index, used before falling back to Nominatim
+        self.city_index = None
+        if CONFIG.CITIES_DB:
+            try:
+                self.city_index = CityIndex(CONFIG.CITIES_DB, CONFIG.REVERSE_GEOCODE_MAX_KM)
+                print(f"Loaded {len(self.city_index)} cities from {CONFIG.CITIES_DB}")
+            except OSError as e:
+                print(f"Failed to load cities database: {str(e)}")
     
-    def get_location_by_ip(self) -> Optional[Dict]:
+    def _nominatim(self, endpoint: str, params: Dict):
+        """
+        Call a Nominatim API endpoint, honouring its 1 request/second policy
+        
+        Args:
+            endpoint: 'search' or 'reverse'
+            params: Query parameters
+            
+        Returns:
+            Parsed JSON response
+        """
+        params = {**params, 'format': 'jsonv2'}
+        with self._nominatim_lock:
+            wait = self._nominatim_last + CONFIG.NOMINATIM_MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                response = self._session.get(f"{CONFIG.NOMINATIM_URL}/{endpoint}", params=params,
+                                             headers=NOMINATIM_HEADERS, timeout=CONFIG.UPSTREAM_TIMEOUT)
+            finally:
+                self._nominatim_last = time.monotonic()
+        
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    def get_location_by_ip(self, ip: Optional[str] = None) -> Optional[Dict]:
         """
         Detect user location using IP address
         
+        Args:
+            ip: Client IP address (optional). Private or missing addresses
+                fall back to the server's own public IP
+        
         Returns:
             Dictionary with location data or None if failed
         """
+        if ip and self.ip_table is not None and self._is_public_ip(ip):
+            location = self.ip_table.lookup(ip)
+            if location:
+                return location
+        
+        return self._inflight.do(f"ip:{ip}", self._fetch_location_by_ip, ip)
+    
+    def _fetch_location_by_ip(self, ip: Optional[str]) -> Optional[Dict]:
+        """Query ip-api.com for an IP based location"""
         try:
             # Use free ip-api.com (more reliable than ipinfo without key)
-            response = requests.get("http://ip-api.com/json/", timeout=5)
+            url = "http://ip-api.com/json/"
+            if ip and self._is_public_ip(ip):
+                url += ip
+            response = self._session.get(url, timeout=CONFIG.UPSTREAM_TIMEOUT)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Parse ip-api.com response
             if data.get('status') == 'success':
@@ -37,6 +119,7 @@ class LocationService:
                     'city': data.get('city', 'Unknown'),
                     'region': data.get('regionName', ''),
                     'country': data.get('country', ''),
+                    'country_code': data.get('countryCode', ''),
                     'latitude': data.get('lat', 0),
                     'longitude': data.get('lon', 0),
                     'timezone': data.get('timezone', ''),
@@ -48,6 +131,14 @@ class LocationService:
             print(f"Failed to detect location by IP: {str(e)}")
             return None
     
+    @staticmethod
+    def _is_public_ip(ip: str) -> bool:
+        """Check whether an address is globally routable"""
+        try:
+            return ipaddress.ip_address(ip).is_global
+        except ValueError:
+            return False
+    
     def get_coordinates_by_city(self, city: str, country: Optional[str] = None) -> Optional[Tuple[float, float]]:
         """
         Get coordinates for a city name
@@ -61,12 +152,12 @@ class LocationService:
         """
         try:
             query = f"{city}, {country}" if country else city
-            location = self.geolocator.geocode(query, timeout=10)  # type: ignore
+            results = self._nominatim('search', {'q': query, 'limit': 1})
             
-            if location:
-                return (location.latitude, location.longitude)  # type: ignore
+            if results:
+                return (float(results[0]['lat']), float(results[0]['lon']))
             return None
-        except (GeocoderTimedOut, GeocoderServiceError) as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"Geocoding error: {str(e)}")
             return None
     
@@ -81,56 +172,83 @@ class LocationService:
         Returns:
             Dictionary with location details or None
         """
+        if self.city_index is not None:
+            location = self.city_index.nearest(lat, lon)
+            if location:
+                return location
+        
+        key = f"rev:{coord_key(lat, lon, 1000)}"
+        return self._inflight.do(key, self._fetch_city_by_coordinates, lat, lon)
+    
+    def _fetch_city_by_coordinates(self, lat: float, lon: float) -> Optional[Dict]:
+        """Reverse geocode coordinates with Nominatim"""
         try:
-            location = self.geolocator.reverse(f"{lat}, {lon}", timeout=10)  # type: ignore
+            data = self._nominatim('reverse', {'lat': lat, 'lon': lon})
             
-            if location and location.raw:  # type: ignore
-                address = location.raw.get('address', {})  # type: ignore
+            if data and 'error' not in data:
+                address = data.get('address', {})
                 return {
                     'city': address.get('city') or address.get('town') or address.get('village', 'Unknown'),
                     'state': address.get('state', ''),
                     'country': address.get('country', ''),
                     'country_code': address.get('country_code', '').upper(),
-                    'display_name': location.address,  # type: ignore
+                    'display_name': data.get('display_name', ''),
                     'latitude': lat,
                     'longitude': lon
                 }
             return None
-        except (GeocoderTimedOut, GeocoderServiceError) as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"Reverse geocoding error: {str(e)}")
             return None
     
-    def search_locations(self, query: str, limit: int = 5) -> list:
+    def search_locations(self, query: str, limit: int = 5, include_raw: bool = False) -> list:
         """
         Search for locations matching a query
         
         Args:
             query: Search query
             limit: Maximum number of results
+            include_raw: Include the full Nominatim record of each result
             
         Returns:
             List of location dictionaries
         """
         try:
-            locations = self.geolocator.geocode(query, exactly_one=False, limit=limit, timeout=10)  # type: ignore
-            
-            if not locations:
-                return []
+            locations = self._nominatim('search', {'q': query, 'limit': limit})
             
             results = []
-            for loc in locations:  # type: ignore
-                results.append({
-                    'display_name': loc.address,
-                    'latitude': loc.latitude,
-                    'longitude': loc.longitude,
-                    'raw': loc.raw
-                })
+            for loc in locations:
+                result = {
+                    'display_name': loc['display_name'],
+                    'latitude': float(loc['lat']),
+                    'longitude': float(loc['lon'])
+                }
+                if include_raw:
+                    result['raw'] = loc
+                results.append(result)
             
             return results
-        except (GeocoderTimedOut, GeocoderServiceError) as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"Location search error: {str(e)}")
             return []
     
+    @staticmethod
+    def to_columns(locations: list) -> Dict:
+        """
+        Convert search results to a columnar layout
+        
+        Args:
+            locations: Results from search_locations
+            
+        Returns:
+            Dictionary of parallel 'name', 'lat' and 'lon' lists
+        """
+        return {
+            'name': [loc['display_name'] for loc in locations],
+            'lat': [loc['latitude'] for loc in locations],
+            'lon': [loc['longitude'] for loc in locations]
+        }
+    
     def get_default_location(self) -> Dict:
         """
         Get a default location (fallback)
@@ -143,6 +261,7 @@ class LocationService:
             'city': 'New Delhi',
             'region': 'Delhi',
             'country': 'India',
+            'country_code': 'IN',
             'latitude': 28.6139,
             'longitude': 77.2090,
             'timezone': 'Asia/Kolkata'
@@ -0,0 +1,182 @@
+"""
+Offline Geolocation Module
+Local lookup tables that answer location queries without a network call
+"""
+import csv
+import gzip
+import ipaddress
+import math
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Optional
+from country_names import country_name
+
+KM_PER_DEGREE = 111.32
+
+
+def _open_text(path: str):
+    """Open a plain or gzip-compressed text file"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+class IPLocationTable:
+    """
+    IPv4 range -> location table searched with binary search
+
+    Loads a db-ip.com "IP to City Lite" CSV (optionally gzipped) with rows of
+    ip_start, ip_end, continent, country, stateprov, city, latitude, longitude.
+    Range bounds are packed into uint32 arrays and locations are deduplicated,
+    so a lookup is one bisect plus an index.
+    """
+
+    def __init__(self, path: str):
+        """Load and index the range table at path"""
+        self._starts = array('I')
+        self._ends = array('I')
+        self._location_ids = array('I')
+        self._locations = []
+
+        location_index = {}
+        rows = []
+        with _open_text(path) as f:
+            for row in csv.reader(f):
+                if len(row) < 8 or ':' in row[0]:
+                    continue  # IPv6 ranges are not indexed
+                try:
+                    start = int(ipaddress.IPv4Address(row[0]))
+                    end = int(ipaddress.IPv4Address(row[1]))
+                    location = (row[5], row[4], row[3], float(row[6]), float(row[7]))
+                except ValueError:
+                    continue  # Header or malformed row
+
+                location_id = location_index.get(location)
+                if location_id is None:
+                    location_id = location_index[location] = len(self._locations)
+                    self._locations.append(location)
+                rows.append((start, end, location_id))
+
+        rows.sort()
+        for start, end, location_id in rows:
+            self._starts.append(start)
+            self._ends.append(end)
+            self._location_ids.append(location_id)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def lookup(self, ip: str) -> Optional[Dict]:
+        """
+        Find the location of an IPv4 address
+
+        Args:
+            ip: IP address string
+
+        Returns:
+            Location dictionary (same shape as LocationService.get_location_by_ip)
+            or None if the address is not covered
+        """
+        try:
+            value = int(ipaddress.IPv4Address(ip))
+        except ValueError:
+            return None
+
+        i = bisect_right(self._starts, value) - 1
+        if i < 0 or value > self._ends[i]:
+            return None
+
+        city, region, country, lat, lon = self._locations[self._location_ids[i]]
+        return {
+            'city': city or 'Unknown',
+            'region': region,
+            'country': country_name(country),
+            'country_code': country.upper(),
+            'latitude': lat,
+            'longitude': lon,
+            'timezone': '',
+        }
+
+
+class CityIndex:
+    """
+    Nearest-city reverse geocoder over a grid spatial index
+
+    Loads a GeoNames cities dump (e.g. cities15000.txt, optionally gzipped)
+    and buckets places into 1x1 degree cells, so a query only measures the
+    handful of cities in the cells around the point.
+    """
+
+    def __init__(self, path: str, max_distance_km: float = 50):
+        """
+        Load and index the cities file at path
+
+        Args:
+            path: GeoNames cities file
+            max_distance_km: Points farther than this from every city get no match
+        """
+        self.max_distance_km = max_distance_km
+        self._cells = defaultdict(list)
+        self._count = 0
+
+        with _open_text(path) as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) < 18:
+                    continue
+                try:
+                    lat = float(fields[4])
+                    lon = float(fields[5])
+                except ValueError:
+                    continue
+                city = (fields[1], fields[8], lat, lon)
+                self._cells[(math.floor(lat), math.floor(lon))].append(city)
+                self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def nearest(self, lat: float, lon: float) -> Optional[Dict]:
+        """
+        Find the nearest city to a coordinate
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            Location dictionary (same shape as LocationService.get_city_by_coordinates)
+            or None if no city is within max_distance_km
+        """
+        cos_lat = max(math.cos(math.radians(lat)), 0.01)
+        lat_cells = math.ceil(self.max_distance_km / KM_PER_DEGREE)
+        lon_cells = min(math.ceil(self.max_distance_km / (KM_PER_DEGREE * cos_lat)), 180)
+        cell_lat, cell_lon = math.floor(lat), math.floor(lon)
+
+        best = None
+        best_distance = self.max_distance_km ** 2
+        for i in range(cell_lat - lat_cells, cell_lat + lat_cells + 1):
+            for j in range(cell_lon - lon_cells, cell_lon + lon_cells + 1):
+                # Wrap longitude cells across the antimeridian
+                for city in self._cells.get((i, (j + 180) % 360 - 180), ()):
+                    dlat = (city[2] - lat) * KM_PER_DEGREE
+                    dlon = ((city[3] - lon + 180) % 360 - 180) * KM_PER_DEGREE * cos_lat
+                    distance = dlat * dlat + dlon * dlon
+                    if distance <= best_distance:
+                        best, best_distance = city, distance
+
+        if best is None:
+            return None
+
+        name, country_code, _, _ = best
+        country = country_name(country_code)
+        return {
+            'city': name,
+            'state': '',
+            'country': country,
+            'country_code': country_code.upper(),
+            'display_name': f"{name}, {country}" if country else name,
+            'latitude': lat,
+            'longitude': lon
+        }
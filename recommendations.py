@@ -2,19 +2,377 @@
 Smart Recommendations Engine
 Provides agriculture and travel-specific recommendations
 """
+import copy
+import time
+from functools import lru_cache
 from typing import Dict, List, Optional
 from datetime import datetime, date
-from config import Config
+from types import MappingProxyType
+import numpy as np
+from config import CONFIG
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - the flag functions run as plain Python
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        return lambda func: func
+
+# Northern Hemisphere season for each month (index 0 unused)
+_SEASON_BY_MONTH = (
+    None,
+    'winter', 'winter',
+    'spring', 'spring', 'spring',
+    'summer', 'summer', 'summer',
+    'autumn', 'autumn', 'autumn',
+    'winter',
+)
+
+# Seasonal crop advice
+_CROP_CALENDAR = MappingProxyType({
+    'spring': (
+        'Good time for planting summer crops like corn, cotton, and vegetables',
+        'Prepare soil with organic matter',
+        'Monitor for late frost warnings'
+    ),
+    'summer': (
+        'Focus on irrigation management',
+        'Monitor for heat stress in crops',
+        'Good time for harvesting wheat and early crops'
+    ),
+    'autumn': (
+        'Plant winter crops like wheat, barley',
+        'Harvest summer crops',
+        'Prepare fields for winter'
+    ),
+    'winter': (
+        'Protect crops from frost',
+        'Plan for spring planting',
+        'Maintain irrigation systems'
+    ),
+})
+
+# Static parts of each alert; variable messages are filled in per call
+_ALERT_HIGH_WIND = MappingProxyType({
+    'type': 'warning',
+    'title': '⚠️ High Wind Alert',
+    'severity': 'high'
+})
+_ALERT_FROST = MappingProxyType({
+    'type': 'danger',
+    'title': '❄️ Frost Warning',
+    'severity': 'critical'
+})
+_ALERT_HEAT_STRESS = MappingProxyType({
+    'type': 'warning',
+    'title': '🌡️ Heat Stress Alert',
+    'severity': 'high'
+})
+_ALERT_HIGH_HUMIDITY = MappingProxyType({
+    'type': 'info',
+    'title': '💧 High Humidity Alert',
+    'severity': 'medium'
+})
+_ALERT_RAIN = MappingProxyType({
+    'type': 'warning',
+    'title': '☔ Rain Expected',
+    'message': 'Pack rain gear and plan indoor activities.',
+    'severity': 'medium'
+})
+_ALERT_STRONG_WIND = MappingProxyType({
+    'type': 'warning',
+    'title': '💨 Strong Winds',
+    'severity': 'high'
+})
+_ALERT_STORM = MappingProxyType({
+    'type': 'danger',
+    'title': '⛈️ Storm Warning',
+    'message': 'Severe weather expected. Stay indoors if possible.',
+    'severity': 'critical'
+})
+_ALERT_POOR_VISIBILITY = MappingProxyType({
+    'type': 'info',
+    'title': '🌫️ Poor Visibility',
+    'message': 'Fog/mist conditions. Drive carefully.',
+    'severity': 'medium'
+})
+
+# Suitable farm activities, indexed by (dry << 2) | (calm << 1) | mild where
+# dry is rain < 1 mm, calm is wind < 20 km/h and mild is 10-30°C
+_OUTDOOR_ACTIVITIES = (
+    'Pesticide/fertilizer application',
+    'Harvesting',
+    'Field preparation',
+    'Planting',
+    'Equipment maintenance'
+)
+_DRY_ACTIVITIES = (
+    'Harvesting (if crops are ready)',
+    'Equipment maintenance',
+    'Storage management'
+)
+_WET_ACTIVITIES = (
+    'Indoor activities only',
+    'Planning and paperwork',
+    'Equipment cleaning and maintenance'
+)
+_FARM_ACTIVITIES = (
+    _WET_ACTIVITIES,       # 0b000
+    _WET_ACTIVITIES,       # 0b001
+    _WET_ACTIVITIES,       # 0b010
+    _WET_ACTIVITIES,       # 0b011
+    (),                    # 0b100 - dry but windy
+    (),                    # 0b101 - dry but windy
+    _DRY_ACTIVITIES,       # 0b110
+    _OUTDOOR_ACTIVITIES,   # 0b111
+)
+
+# Message templates, formatted only when their branch fires
+_T_HIGH_WIND = 'Wind speed is {:.1f} km/h. Avoid pesticide/fertilizer spraying.'
+_T_FROST = 'Temperature is {:.1f}°C. Protect sensitive crops from frost damage.'
+_T_HEAT_STRESS = 'High temperature {:.1f}°C may stress crops. Ensure adequate irrigation.'
+_T_HEAVY_RAIN = 'Heavy rainfall detected ({:.1f}mm). Delay irrigation.'
+_T_LIGHT_RAIN = 'Light rainfall ({:.1f}mm) expected. Monitor soil moisture.'
+_T_UPCOMING_RAIN = 'Rain expected in next 3 days ({:.1f}mm). Plan irrigation accordingly.'
+_T_HIGH_HUMIDITY = 'Humidity at {}%. Increased risk of fungal diseases.'
+_T_COLD = 'Cold weather ({:.1f}°C). Pack warm clothing.'
+_T_HOT = 'Hot weather ({:.1f}°C). Stay hydrated and use sun protection.'
+_T_STRONG_WIND = 'Wind speed {:.1f} km/h. Be cautious outdoors.'
+_T_SUNRISE = 'Sunrise at {} - Great for photography'
+_T_SUNSET = 'Sunset at {} - Beautiful evening views'
+
+# Travel packing list additions
+_PACK_COLD = ('Warm jacket', 'Gloves', 'Scarf', 'Thermal wear')
+_PACK_HOT = ('Sunscreen', 'Hat', 'Sunglasses', 'Light clothing', 'Water bottle')
+_PACK_MILD = ('Light jacket', 'Comfortable clothing')
+_PACK_RAIN = ('Umbrella', 'Raincoat', 'Waterproof bag')
+
+# Weather description keywords for the travel condition checks
+_RAIN_TOKENS = frozenset({'rain', 'drizzle', 'shower'})
+_CLEAR_TOKENS = frozenset({'clear', 'sun', 'sunny'})
+_STORM_TOKENS = frozenset({'storm', 'thunder', 'thunderstorm'})
+_FOG_TOKENS = frozenset({'fog', 'mist', 'haze'})
+
+# Bits set by the numeric threshold checks
+_AGRI_HIGH_WIND = 1
+_AGRI_FROST = 2
+_AGRI_HEAT_STRESS = 4
+_AGRI_HEAVY_RAIN = 8
+_AGRI_LIGHT_RAIN = 16
+_AGRI_HIGH_HUMIDITY = 32
+_AGRI_UPCOMING_RAIN = 64
+
+_TRAVEL_COLD = 1
+_TRAVEL_HOT = 2
+_TRAVEL_RAIN = 4
+_TRAVEL_HIGH_WIND = 8
+_TRAVEL_VERY_HOT = 16
+_TRAVEL_VERY_COLD = 32
+
+# Forecast outlook summaries for travel
+_TRAVEL_OUTLOOK_SUMMARY = MappingProxyType({
+    'poor': 'Challenging weather ahead. Consider rescheduling outdoor activities.',
+    'excellent': 'Excellent weather forecast for the next few days!',
+    'fair': 'Fair weather expected. Pack accordingly.',
+})
+
+
+@njit(cache=True)
+def _agri_flags(temp, wind_speed, humidity, rain, frost_temp, heat_stress, wind_speed_spray,
+                rain_threshold, high_humidity):
+    """Evaluate the agriculture thresholds into a bitmask of _AGRI_* flags"""
+    flags = 0
+    if wind_speed > wind_speed_spray:
+        flags |= _AGRI_HIGH_WIND
+    if temp <= frost_temp:
+        flags |= _AGRI_FROST
+    elif temp >= heat_stress:
+        flags |= _AGRI_HEAT_STRESS
+    if rain > rain_threshold:
+        flags |= _AGRI_HEAVY_RAIN
+    elif rain > 0:
+        flags |= _AGRI_LIGHT_RAIN
+    if humidity >= high_humidity:
+        flags |= _AGRI_HIGH_HUMIDITY
+    return flags
+
+
+@njit(cache=True)
+def _travel_flags(temp, wind_speed, rain, cold_weather, hot_weather, rain_warning, wind_warning):
+    """Evaluate the travel thresholds into a bitmask of _TRAVEL_* flags"""
+    flags = 0
+    if temp <= cold_weather:
+        flags |= _TRAVEL_COLD
+    elif temp >= hot_weather:
+        flags |= _TRAVEL_HOT
+    if rain > rain_warning:
+        flags |= _TRAVEL_RAIN
+    if wind_speed > wind_warning:
+        flags |= _TRAVEL_HIGH_WIND
+    return flags
+
+
+@lru_cache(maxsize=512)
+def _agri_impl(flags: int, activity_index: int, temp: float, wind_speed: float, humidity: int,
+               rain: float, season: str, upcoming_rain: Optional[float]) -> Dict:
+    """
+    Build agriculture recommendations from threshold flags and display values
+    
+    The flags and activity index are evaluated on the raw readings; the
+    rounded values only fill in the messages. Pure function of its
+    arguments, so repeated requests for the same conditions are answered
+    from the cache. Callers must not mutate the result.
+    """
+    recommendations = []
+    alerts = []
+    tasks = []
+    
+    # Wind-related recommendations
+    if flags & _AGRI_HIGH_WIND:
+        alerts.append(dict(_ALERT_HIGH_WIND, message=_T_HIGH_WIND.format(wind_speed)))
+        tasks.append('Postpone spraying operations until wind subsides')
+    else:
+        tasks.append('✓ Good conditions for spraying operations')
+    
+    # Temperature-related recommendations
+    if flags & _AGRI_FROST:
+        alerts.append(dict(_ALERT_FROST, message=_T_FROST.format(temp)))
+        tasks.append('Cover sensitive crops or use frost protection methods')
+    elif flags & _AGRI_HEAT_STRESS:
+        alerts.append(dict(_ALERT_HEAT_STRESS, message=_T_HEAT_STRESS.format(temp)))
+        tasks.append('Increase irrigation frequency')
+    
+    # Rainfall recommendations
+    if flags & _AGRI_HEAVY_RAIN:
+        recommendations.append(_T_HEAVY_RAIN.format(rain))
+        tasks.append('Skip irrigation today - sufficient rainfall')
+    elif flags & _AGRI_LIGHT_RAIN:
+        recommendations.append(_T_LIGHT_RAIN.format(rain))
+    else:
+        # Check forecast for rain
+        if upcoming_rain is not None:
+            if flags & _AGRI_UPCOMING_RAIN:
+                recommendations.append(_T_UPCOMING_RAIN.format(upcoming_rain))
+            else:
+                tasks.append('Regular irrigation recommended')
+    
+    # Humidity recommendations
+    if flags & _AGRI_HIGH_HUMIDITY:
+        alerts.append(dict(_ALERT_HIGH_HUMIDITY, message=_T_HIGH_HUMIDITY.format(humidity)))
+        recommendations.append('Monitor crops for signs of fungal infection')
+        tasks.append('Apply preventive fungicide if needed')
+    
+    # Seasonal crop recommendations
+    crop_advice = _CROP_CALENDAR.get(season, ())
+    recommendations.extend(crop_advice)
+    
+    return {
+        'alerts': alerts,
+        'recommendations': recommendations,
+        'tasks': tasks,
+        'suitable_activities': list(_FARM_ACTIVITIES[activity_index]),
+        'crop_advice': crop_advice
+    }
+
+
+@lru_cache(maxsize=512)
+def _travel_impl(flags: int, temp: float, wind_speed: float, description: str,
+                 outlook: Optional[str], sunrise: Optional[str], sunset: Optional[str]) -> Dict:
+    """
+    Build travel recommendations from threshold flags and display values
+    
+    The flags and forecast outlook are evaluated on the raw readings; the
+    rounded values only fill in the messages. Pure function of its
+    arguments, so repeated requests for the same conditions are answered
+    from the cache. Callers must not mutate the result.
+    """
+    tokens = set(description.split())
+    recommendations = []
+    alerts = []
+    packing_list = []
+    
+    # Temperature-based packing
+    if flags & _TRAVEL_COLD:
+        packing_list.extend(_PACK_COLD)
+        recommendations.append(_T_COLD.format(temp))
+    elif flags & _TRAVEL_HOT:
+        packing_list.extend(_PACK_HOT)
+        recommendations.append(_T_HOT.format(temp))
+    else:
+        packing_list.extend(_PACK_MILD)
+    
+    # Rain recommendations
+    if flags & _TRAVEL_RAIN or not tokens.isdisjoint(_RAIN_TOKENS):
+        alerts.append(dict(_ALERT_RAIN))
+        packing_list.extend(_PACK_RAIN)
+        recommendations.append('Consider indoor attractions or activities')
+    
+    # Wind warnings
+    if flags & _TRAVEL_HIGH_WIND:
+        alerts.append(dict(_ALERT_STRONG_WIND, message=_T_STRONG_WIND.format(wind_speed)))
+        recommendations.append('Avoid outdoor activities in exposed areas')
+    
+    # Weather condition recommendations
+    if not tokens.isdisjoint(_CLEAR_TOKENS):
+        recommendations.append('Perfect weather for sightseeing and outdoor activities!')
+    elif not tokens.isdisjoint(_STORM_TOKENS):
+        alerts.append(dict(_ALERT_STORM))
+        recommendations.append('Postpone outdoor plans. Seek shelter.')
+    elif not tokens.isdisjoint(_FOG_TOKENS):
+        alerts.append(dict(_ALERT_POOR_VISIBILITY))
+        recommendations.append('Exercise caution while driving. Allow extra travel time.')
+    
+    # Forecast-based recommendations
+    travel_outlook = 'good'
+    if outlook is not None:
+        recommendations.append(_TRAVEL_OUTLOOK_SUMMARY[outlook])
+        travel_outlook = outlook
+    
+    return {
+        'alerts': alerts,
+        'recommendations': recommendations,
+        'packing_list': packing_list,
+        'travel_outlook': travel_outlook,
+        'best_times': _get_best_travel_times(sunrise, sunset, flags)
+    }
+
+
+def _farm_activity_index(temp: float, wind_speed: float, rain: float) -> int:
+    """Index into _FARM_ACTIVITIES for the current weather"""
+    return ((rain < 1) << 2) | ((wind_speed < 20) << 1) | (10 <= temp <= 30)
+
+
+def _analyze_forecast_for_travel(total_rain: float, avg_temp: float, max_wind: float) -> str:
+    """Classify forecast totals into a travel outlook"""
+    if total_rain > 20 or max_wind > 50:
+        return 'poor'
+    elif total_rain < 5 and 15 <= avg_temp <= 28:
+        return 'excellent'
+    else:
+        return 'fair'
+
+
+def _get_best_travel_times(sunrise: Optional[str], sunset: Optional[str], flags: int) -> List[str]:
+    """Suggest best times for travel/outdoor activities"""
+    suggestions = []
+    
+    if sunrise:
+        suggestions.append(_T_SUNRISE.format(sunrise))
+    if sunset:
+        suggestions.append(_T_SUNSET.format(sunset))
+    
+    # Suggest based on temperature
+    if flags & _TRAVEL_VERY_HOT:
+        suggestions.append('Visit outdoor attractions early morning or late evening to avoid heat')
+    elif flags & _TRAVEL_VERY_COLD:
+        suggestions.append('Midday (11 AM - 3 PM) will be warmest for outdoor activities')
+    
+    return suggestions
 
 
 class RecommendationEngine:
     """Engine for generating smart weather-based recommendations"""
     
-    def __init__(self):
-        """Initialize recommendation engine"""
-        self.ag_thresholds = Config.AGRICULTURE_THRESHOLDS
-        self.travel_thresholds = Config.TRAVEL_THRESHOLDS
-    
     def get_agriculture_recommendations(self, weather_data: Dict, forecast: Optional[List[Dict]] = None) -> Dict:
         """
         Generate agriculture-specific recommendations
@@ -26,83 +384,38 @@ class RecommendationEngine:
         Returns:
             Dictionary with recommendations and alerts
         """
-        recommendations = []
-        alerts = []
-        tasks = []
-        
         temp = weather_data['temperature']
         wind_speed = weather_data['wind_speed']
         humidity = weather_data['humidity']
-        rain = weather_data.get('rain_1h', 0) + weather_data.get('rain_3h', 0)
-        
-        # Wind-related recommendations
-        if wind_speed > self.ag_thresholds['wind_speed_spray']:
-            alerts.append({
-                'type': 'warning',
-                'title': '⚠️ High Wind Alert',
-                'message': f'Wind speed is {wind_speed:.1f} km/h. Avoid pesticide/fertilizer spraying.',
-                'severity': 'high'
-            })
-            tasks.append('Postpone spraying operations until wind subsides')
-        else:
-            tasks.append('✓ Good conditions for spraying operations')
-        
-        # Temperature-related recommendations
-        if temp <= self.ag_thresholds['frost_temp']:
-            alerts.append({
-                'type': 'danger',
-                'title': '❄️ Frost Warning',
-                'message': f'Temperature is {temp:.1f}°C. Protect sensitive crops from frost damage.',
-                'severity': 'critical'
-            })
-            tasks.append('Cover sensitive crops or use frost protection methods')
-        elif temp >= self.ag_thresholds['heat_stress']:
-            alerts.append({
-                'type': 'warning',
-                'title': '🌡️ Heat Stress Alert',
-                'message': f'High temperature {temp:.1f}°C may stress crops. Ensure adequate irrigation.',
-                'severity': 'high'
-            })
-            tasks.append('Increase irrigation frequency')
+        rain = weather_data['rain_total']
+        thresholds = CONFIG.AGRICULTURE_THRESHOLDS
         
-        # Rainfall recommendations
-        if rain > self.ag_thresholds['rain_threshold']:
-            recommendations.append(f'Heavy rainfall detected ({rain:.1f}mm). Delay irrigation.')
-            tasks.append('Skip irrigation today - sufficient rainfall')
-        elif rain > 0:
-            recommendations.append(f'Light rainfall ({rain:.1f}mm) expected. Monitor soil moisture.')
-        else:
-            # Check forecast for rain
-            if forecast:
-                upcoming_rain = sum(f['total_rain'] for f in forecast[:3])
-                if upcoming_rain > 5:
-                    recommendations.append(f'Rain expected in next 3 days ({upcoming_rain:.1f}mm). Plan irrigation accordingly.')
-                else:
-                    tasks.append('Regular irrigation recommended')
-        
-        # Humidity recommendations
-        if humidity >= self.ag_thresholds['high_humidity']:
-            alerts.append({
-                'type': 'info',
-                'title': '💧 High Humidity Alert',
-                'message': f'Humidity at {humidity}%. Increased risk of fungal diseases.',
-                'severity': 'medium'
-            })
-            recommendations.append('Monitor crops for signs of fungal infection')
-            tasks.append('Apply preventive fungicide if needed')
-        
-        # Seasonal crop recommendations
-        current_season = self._get_season()
-        crop_advice = self._get_crop_advice(current_season, weather_data)
-        recommendations.extend(crop_advice)
+        # Thresholds are checked on the raw readings so rounding cannot flip them
+        flags = _agri_flags(temp, wind_speed, humidity, rain,
+                            thresholds['frost_temp'], thresholds['heat_stress'],
+                            thresholds['wind_speed_spray'], thresholds['rain_threshold'],
+                            thresholds['high_humidity'])
+        upcoming_rain = None
+        if forecast:
+            upcoming_rain = sum(f['total_rain'] for f in forecast[:3])
+            if upcoming_rain > 5:
+                flags |= _AGRI_UPCOMING_RAIN
+            upcoming_rain = round(upcoming_rain, 1)
         
-        return {
-            'alerts': alerts,
-            'recommendations': recommendations,
-            'tasks': tasks,
-            'suitable_activities': self._get_suitable_farm_activities(weather_data),
-            'crop_advice': crop_advice
-        }
+        # Everything else is quantized to the precision the messages display,
+        # so nearby readings share a cache entry
+        result = _agri_impl(
+            flags,
+            _farm_activity_index(temp, wind_speed, weather_data.get('rain_1h', 0)),
+            round(temp, 1),
+            round(wind_speed, 1),
+            round(humidity),
+            round(rain, 1),
+            self._get_season(),
+            upcoming_rain
+        )
+        # The cached result is shared - hand out a private copy
+        return copy.deepcopy(result)
     
     def get_travel_recommendations(self, weather_data: Dict, forecast: Optional[List[Dict]] = None) -> Dict:
         """
@@ -115,197 +428,46 @@ class RecommendationEngine:
         Returns:
             Dictionary with travel recommendations
         """
-        recommendations = []
-        alerts = []
-        packing_list = []
-        
-        temp = weather_data['temperature']
-        wind_speed = weather_data['wind_speed']
-        rain = weather_data.get('rain_1h', 0) + weather_data.get('rain_3h', 0)
-        description = weather_data.get('main', '').lower()
-        
-        # Temperature-based packing
-        if temp <= self.travel_thresholds['cold_weather']:
-            packing_list.extend(['Warm jacket', 'Gloves', 'Scarf', 'Thermal wear'])
-            recommendations.append(f'Cold weather ({temp:.1f}°C). Pack warm clothing.')
-        elif temp >= self.travel_thresholds['hot_weather']:
-            packing_list.extend(['Sunscreen', 'Hat', 'Sunglasses', 'Light clothing', 'Water bottle'])
-            recommendations.append(f'Hot weather ({temp:.1f}°C). Stay hydrated and use sun protection.')
-        else:
-            packing_list.extend(['Light jacket', 'Comfortable clothing'])
-        
-        # Rain recommendations
-        if rain > self.travel_thresholds['rain_warning'] or 'rain' in description:
-            alerts.append({
-                'type': 'warning',
-                'title': '☔ Rain Expected',
-                'message': 'Pack rain gear and plan indoor activities.',
-                'severity': 'medium'
-            })
-            packing_list.extend(['Umbrella', 'Raincoat', 'Waterproof bag'])
-            recommendations.append('Consider indoor attractions or activities')
-        
-        # Wind warnings
-        if wind_speed > self.travel_thresholds['wind_warning']:
-            alerts.append({
-                'type': 'warning',
-                'title': '💨 Strong Winds',
-                'message': f'Wind speed {wind_speed:.1f} km/h. Be cautious outdoors.',
-                'severity': 'high'
-            })
-            recommendations.append('Avoid outdoor activities in exposed areas')
-        
-        # Weather condition recommendations
-        if 'clear' in description or 'sun' in description:
-            recommendations.append('Perfect weather for sightseeing and outdoor activities!')
-        elif 'storm' in description or 'thunder' in description:
-            alerts.append({
-                'type': 'danger',
-                'title': '⛈️ Storm Warning',
-                'message': 'Severe weather expected. Stay indoors if possible.',
-                'severity': 'critical'
-            })
-            recommendations.append('Postpone outdoor plans. Seek shelter.')
-        elif 'fog' in description or 'mist' in description:
-            alerts.append({
-                'type': 'info',
-                'title': '🌫️ Poor Visibility',
-                'message': 'Fog/mist conditions. Drive carefully.',
-                'severity': 'medium'
-            })
-            recommendations.append('Exercise caution while driving. Allow extra travel time.')
-        
-        # Forecast-based recommendations
-        travel_outlook = 'good'
-        if forecast:
-            forecast_summary = self._analyze_forecast_for_travel(forecast)
-            recommendations.append(forecast_summary['summary'])
-            travel_outlook = forecast_summary['outlook']
-        
-        return {
-            'alerts': alerts,
-            'recommendations': recommendations,
-            'packing_list': packing_list,
-            'travel_outlook': travel_outlook,
-            'best_times': self._get_best_travel_times(weather_data, forecast)
-        }
-    
-    def _get_season(self) -> str:
-        """Determine current season based on month"""
-        month = datetime.now().month
-        
-        # Northern Hemisphere seasons
-        if month in [12, 1, 2]:
-            return 'winter'
-        elif month in [3, 4, 5]:
-            return 'spring'
-        elif month in [6, 7, 8]:
-            return 'summer'
-        else:
-            return 'autumn'
-    
-    def _get_crop_advice(self, season: str, weather_data: Dict) -> List[str]:
-        """Get seasonal crop advice"""
-        advice = []
-        
-        crop_calendar = {
-            'spring': [
-                'Good time for planting summer crops like corn, cotton, and vegetables',
-                'Prepare soil with organic matter',
-                'Monitor for late frost warnings'
-            ],
-            'summer': [
-                'Focus on irrigation management',
-                'Monitor for heat stress in crops',
-                'Good time for harvesting wheat and early crops'
-            ],
-            'autumn': [
-                'Plant winter crops like wheat, barley',
-                'Harvest summer crops',
-                'Prepare fields for winter'
-            ],
-            'winter': [
-                'Protect crops from frost',
-                'Plan for spring planting',
-                'Maintain irrigation systems'
-            ]
-        }
-        
-        return crop_calendar.get(season, [])
-    
-    def _get_suitable_farm_activities(self, weather_data: Dict) -> List[str]:
-        """Determine suitable farming activities for current weather"""
-        activities = []
-        
         temp = weather_data['temperature']
         wind_speed = weather_data['wind_speed']
-        rain = weather_data.get('rain_1h', 0)
-        
-        if rain < 1 and wind_speed < 20 and 10 <= temp <= 30:
-            activities.extend([
-                'Pesticide/fertilizer application',
-                'Harvesting',
-                'Field preparation',
-                'Planting',
-                'Equipment maintenance'
-            ])
-        elif rain < 1 and wind_speed < 20:
-            activities.extend([
-                'Harvesting (if crops are ready)',
-                'Equipment maintenance',
-                'Storage management'
-            ])
-        elif rain >= 1:
-            activities.extend([
-                'Indoor activities only',
-                'Planning and paperwork',
-                'Equipment cleaning and maintenance'
-            ])
-        
-        return activities
-    
-    def _analyze_forecast_for_travel(self, forecast: List[Dict]) -> Dict:
-        """Analyze forecast for travel planning"""
-        if not forecast:
-            return {'summary': 'No forecast data available', 'outlook': 'unknown'}
-        
-        total_rain = sum(f['total_rain'] for f in forecast)
-        avg_temp = sum(f['temp_avg'] for f in forecast) / len(forecast)
-        max_wind = max(f['wind_speed_max'] for f in forecast)
-        
-        if total_rain > 20 or max_wind > 50:
-            return {
-                'summary': 'Challenging weather ahead. Consider rescheduling outdoor activities.',
-                'outlook': 'poor'
-            }
-        elif total_rain < 5 and 15 <= avg_temp <= 28:
-            return {
-                'summary': 'Excellent weather forecast for the next few days!',
-                'outlook': 'excellent'
-            }
-        else:
-            return {
-                'summary': 'Fair weather expected. Pack accordingly.',
-                'outlook': 'fair'
-            }
-    
-    def _get_best_travel_times(self, weather_data: Dict, forecast: Optional[List[Dict]]) -> List[str]:
-        """Suggest best times for travel/outdoor activities"""
-        suggestions = []
-        
         sunrise = weather_data.get('sunrise')
         sunset = weather_data.get('sunset')
+        thresholds = CONFIG.TRAVEL_THRESHOLDS
         
-        if sunrise:
-            suggestions.append(f'Sunrise at {sunrise.strftime("%H:%M")} - Great for photography')
-        if sunset:
-            suggestions.append(f'Sunset at {sunset.strftime("%H:%M")} - Beautiful evening views')
-        
-        # Suggest based on temperature
-        temp = weather_data['temperature']
+        # Thresholds are checked on the raw readings so rounding cannot flip them
+        flags = _travel_flags(temp, wind_speed, weather_data['rain_total'],
+                              thresholds['cold_weather'], thresholds['hot_weather'],
+                              thresholds['rain_warning'], thresholds['wind_warning'])
         if temp > 30:
-            suggestions.append('Visit outdoor attractions early morning or late evening to avoid heat')
+            flags |= _TRAVEL_VERY_HOT
         elif temp < 10:
-            suggestions.append('Midday (11 AM - 3 PM) will be warmest for outdoor activities')
+            flags |= _TRAVEL_VERY_COLD
         
-        return suggestions
+        result = _travel_impl(
+            flags,
+            round(temp, 1),
+            round(wind_speed, 1),
+            weather_data.get('main', '').lower(),
+            self._forecast_outlook(forecast) if forecast else None,
+            time.strftime('%H:%M', time.localtime(sunrise)) if sunrise else None,
+            time.strftime('%H:%M', time.localtime(sunset)) if sunset else None
+        )
+        return copy.deepcopy(result)
+    
+    def _get_season(self) -> str:
+        """Determine current season based on month"""
+        return _SEASON_BY_MONTH[datetime.now().month]
+    
+    def _forecast_outlook(self, forecast: List[Dict]) -> str:
+        """Travel outlook from the forecast's total rain, average temp and max wind"""
+        # One pass over the forecast into a (days, 3) array, then C-level reductions
+        values = np.fromiter(
+            ((f['total_rain'], f['temp_avg'], f['wind_speed_max']) for f in forecast),
+            dtype=np.dtype((np.float64, 3)),
+            count=len(forecast)
+        )
+        return _analyze_forecast_for_travel(
+            float(values[:, 0].sum()),
+            float(values[:, 1].mean()),
+            float(values[:, 2].max())
+        )
@@ -216,49 +216,8 @@ async function loadCharts() {
         if (tempData.success) {
             const chartContainer = document.getElementById('temperatureChart');
             if (chartContainer) {
-                // Clear the container first
-                chartContainer.innerHTML = '';
-                
-                // Create a temporary div to hold the HTML
-                const tempDiv = document.createElement('div');
-                tempDiv.innerHTML = tempData.chart;
-                
-                // Append all scripts and content
-                const scripts = tempDiv.querySelectorAll('script');
-                const chartDiv = tempDiv.querySelector('.plotly-graph-div');
-                
-                if (chartDiv) {
-                    chartContainer.appendChild(chartDiv);
-                    
-                    // Execute each script
-                    scripts.forEach((script) => {
-                        const newScript = document.createElement('script');
-                        if (script.src) {
-                            newScript.src = script.src;
-                        } else {
-                            newScript.textContent = script.textContent;
-                        }
-                        document.head.appendChild(newScript);
-                        setTimeout(() => document.head.removeChild(newScript), 1000);
-                    });
-                    
-                    console.log('✅ Temperature chart loaded successfully');
-                    console.log('Chart HTML length:', tempData.chart.length);
-                } else {
-                    // Fallback: just insert the HTML
-                    chartContainer.innerHTML = tempData.chart;
-                    console.log('⚠️ Using fallback method');
-                }
-                
-                setTimeout(() => {
-                    const plotlyDiv = chartContainer.querySelector('.plotly-graph-div');
-                    if (plotlyDiv) {
-                        console.log('✅ Plotly div found:', plotlyDiv.id);
-                        console.log('Plotly div dimensions:', plotlyDiv.offsetWidth, 'x', plotlyDiv.offsetHeight);
-                    } else {
-                        console.error('❌ Plotly div not found');
-                    }
-                }, 1000);
+                Utils.renderChart(chartContainer, tempData.chart);
+                console.log('✅ Temperature chart loaded successfully');
             } else {
                 console.error('❌ Temperature chart container not found');
             }
@@ -285,49 +244,8 @@ async function loadCharts() {
         if (rainData.success) {
             const chartContainer = document.getElementById('rainfallChart');
             if (chartContainer) {
-                // Clear the container first
-                chartContainer.innerHTML = '';
-                
-                // Create a temporary div to hold the HTML
-                const tempDiv = document.createElement('div');
-                tempDiv.innerHTML = rainData.chart;
-                
-                // Append all scripts and content
-                const scripts = tempDiv.querySelectorAll('script');
-                const chartDiv = tempDiv.querySelector('.plotly-graph-div');
-                
-                if (chartDiv) {
-                    chartContainer.appendChild(chartDiv);
-                    
-                    // Execute each script
-                    scripts.forEach((script) => {
-                        const newScript = document.createElement('script');
-                        if (script.src) {
-                            newScript.src = script.src;
-                        } else {
-                            newScript.textContent = script.textContent;
-                        }
-                        document.head.appendChild(newScript);
-                        setTimeout(() => document.head.removeChild(newScript), 1000);
-                    });
-                    
-                    console.log('✅ Rainfall chart loaded successfully');
-                    console.log('Chart HTML length:', rainData.chart.length);
-                } else {
-                    // Fallback: just insert the HTML
-                    chartContainer.innerHTML = rainData.chart;
-                    console.log('⚠️ Using fallback method for rainfall');
-                }
-                
-                setTimeout(() => {
-                    const plotlyDiv = chartContainer.querySelector('.plotly-graph-div');
-                    if (plotlyDiv) {
-                        console.log('✅ Rainfall Plotly div found:', plotlyDiv.id);
-                        console.log('Rainfall div dimensions:', plotlyDiv.offsetWidth, 'x', plotlyDiv.offsetHeight);
-                    } else {
-                        console.error('❌ Rainfall Plotly div not found');
-                    }
-                }, 1000);
+                Utils.renderChart(chartContainer, rainData.chart);
+                console.log('✅ Rainfall chart loaded successfully');
             } else {
                 console.error('❌ Rainfall chart container not found');
             }
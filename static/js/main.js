@@ -32,6 +32,16 @@ const Utils = {
     hideLoading: () => {
         document.getElementById('loadingSpinner')?.style.setProperty('display', 'none');
         document.getElementById('weatherDashboard')?.style.setProperty('display', 'block');
+    },
+
+    // Draw a plotly figure returned by the visualization endpoints
+    renderChart: (container, figure) => {
+        Plotly.purge(container);
+        container.innerHTML = '';
+        return Plotly.newPlot(container, figure.data, figure.layout, {
+            displayModeBar: true,
+            responsive: true
+        });
     }
 };
 
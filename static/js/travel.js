@@ -278,35 +278,8 @@ async function loadCharts() {
         if (tempData.success) {
             const chartContainer = document.getElementById('temperatureChart');
             if (chartContainer) {
-                // Clear the container first
-                chartContainer.innerHTML = '';
-                
-                // Create a temporary div to hold the HTML
-                const tempDiv = document.createElement('div');
-                tempDiv.innerHTML = tempData.chart;
-                
-                // Append all scripts and content
-                const scripts = tempDiv.querySelectorAll('script');
-                const chartDiv = tempDiv.querySelector('.plotly-graph-div');
-                
-                if (chartDiv) {
-                    chartContainer.appendChild(chartDiv);
-                    
-                    // Execute each script
-                    scripts.forEach((script) => {
-                        const newScript = document.createElement('script');
-                        if (script.src) {
-                            newScript.src = script.src;
-                        } else {
-                            newScript.textContent = script.textContent;
-                        }
-                        document.body.appendChild(newScript);
-                    });
-                    
-                    console.log('✅ Temperature chart loaded successfully');
-                } else {
-                    chartContainer.innerHTML = tempData.chart;
-                }
+                Utils.renderChart(chartContainer, tempData.chart);
+                console.log('✅ Temperature chart loaded successfully');
             } else {
                 console.error('❌ Temperature chart container not found');
             }
@@ -333,35 +306,8 @@ async function loadCharts() {
         if (rainData.success) {
             const chartContainer = document.getElementById('rainfallChart');
             if (chartContainer) {
-                // Clear the container first
-                chartContainer.innerHTML = '';
-                
-                // Create a temporary div to hold the HTML
-                const tempDiv = document.createElement('div');
-                tempDiv.innerHTML = rainData.chart;
-                
-                // Append all scripts and content
-                const scripts = tempDiv.querySelectorAll('script');
-                const chartDiv = tempDiv.querySelector('.plotly-graph-div');
-                
-                if (chartDiv) {
-                    chartContainer.appendChild(chartDiv);
-                    
-                    // Execute each script
-                    scripts.forEach((script) => {
-                        const newScript = document.createElement('script');
-                        if (script.src) {
-                            newScript.src = script.src;
-                        } else {
-                            newScript.textContent = script.textContent;
-                        }
-                        document.body.appendChild(newScript);
-                    });
-                    
-                    console.log('✅ Rainfall chart loaded successfully');
-                } else {
-                    chartContainer.innerHTML = rainData.chart;
-                }
+                Utils.renderChart(chartContainer, rainData.chart);
+                console.log('✅ Rainfall chart loaded successfully');
             } else {
                 console.error('❌ Rainfall chart container not found');
             }
@@ -3,43 +3,55 @@ Simple test script to verify the setup
 """
 import sys
 import os
+from importlib.util import find_spec
 
 def check_python_version():
     """Check if Python version is adequate"""
     print("Checking Python version...")
     version = sys.version_info
-    if version.major >= 3 and version.minor >= 8:
+    if version >= (3, 10):
         print(f"✓ Python {version.major}.{version.minor}.{version.micro} - OK")
         return True
     else:
-        print(f"✗ Python {version.major}.{version.minor}.{version.micro} - Need Python 3.8+")
+        print(f"✗ Python {version.major}.{version.minor}.{version.micro} - Need Python 3.10+")
         return False
 
 def check_dependencies():
     """Check if required packages are installed"""
     print("\nChecking dependencies...")
+    # Everything app.py and the modules it imports need at import time or
+    # to serve the default (interactive) charts
     required = [
         'flask',
+        'flask_compress',
         'requests',
-        'geopy',
-        'matplotlib',
-        'seaborn',
+        'orjson',
+        'numpy',
         'plotly',
         'pandas',
         'dotenv'
     ]
+    # Used when present; the app runs without them
+    optional = [
+        'matplotlib',  # PNG charts (WEATHER_ENABLE_PNG=1)
+        'redis',       # shared response cache
+        'httpx',       # AsyncWeatherService
+    ]
     
     missing = []
     for package in required:
-        try:
-            if package == 'dotenv':
-                __import__('dotenv')
-            else:
-                __import__(package)
-            print(f"✓ {package} - installed")
-        except ImportError:
+        # find_spec only locates the package, without running its (often slow) import
+        if find_spec(package) is None:
             print(f"✗ {package} - missing")
             missing.append(package)
+        else:
+            print(f"✓ {package} - installed")
+    
+    for package in optional:
+        if find_spec(package) is None:
+            print(f"- {package} - not installed (optional)")
+        else:
+            print(f"✓ {package} - installed")
     
     if missing:
         print(f"\nMissing packages: {', '.join(missing)}")
@@ -2,80 +2,205 @@
 Weather Data Visualization Module
 Creates charts and graphs for weather data
 """
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend for web apps
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 import io
 import base64
-import pandas as pd
+import orjson
+from config import CONFIG
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Charting libraries are imported on first use, so workers that never
+# draw a chart don't pay their import cost at startup. matplotlib is only
+# ever imported when CONFIG.ENABLE_PNG_CHARTS is set.
+Figure = None
+FigureCanvasAgg = None
+go = None
+pd = None
+
+
+def _new_figure():
+    """
+    Create a matplotlib figure on its own Agg canvas, with one axes
+    
+    Bypasses pyplot's global figure manager, so each chart owns its figure
+    and charts can be rendered concurrently from several request threads.
+    matplotlib is imported and styled on first use.
+    """
+    global Figure, FigureCanvasAgg
+    if not CONFIG.ENABLE_PNG_CHARTS:
+        raise ValueError("format='png' requires PNG charts to be enabled (set WEATHER_ENABLE_PNG=1)")
+    if Figure is None:
+        import matplotlib
+        from matplotlib.figure import Figure as figure_class
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as canvas_class
+        
+        # seaborn's "whitegrid" style, without importing seaborn for it
+        matplotlib.rcParams.update({
+            'axes.facecolor': 'white',
+            'axes.edgecolor': '.8',
+            'axes.grid': True,
+            'grid.color': '.8',
+            'grid.linestyle': '-',
+            'font.size': 10,
+        })
+        FigureCanvasAgg = canvas_class
+        Figure = figure_class
+    
+    fig = Figure(figsize=(12, 6), dpi=100)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _go():
+    """Return plotly.graph_objects, importing it on first use"""
+    global go
+    if go is None:
+        import plotly.graph_objects as go_module
+        go = go_module
+    return go
+
+
+def _pd():
+    """Return pandas, importing it on first use"""
+    global pd
+    if pd is None:
+        import pandas as pd_module
+        pd = pd_module
+    return pd
+
+
+def _format_dates(forecast: List[Dict], fmt: str) -> List[str]:
+    """Format every forecast date in one vectorized pandas call"""
+    return _pd().to_datetime([f['date'] for f in forecast]).strftime(fmt).tolist()
+
+
+def _figure_json(fig) -> str:
+    """Serialize a plotly figure with orjson instead of plotly's json-based encoder"""
+    return orjson.dumps(fig.to_plotly_json(), option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+# Plotly figure sent when there is no forecast to plot
+NO_DATA_FIGURE = '{"data": [], "layout": {"title": {"text": "No forecast data available"}}}'
+
+# Forecast fields each chart reads, besides the date
+TEMPERATURE_FIELDS = ('temp_max', 'temp_min', 'temp_avg')
+RAINFALL_FIELDS = ('total_rain',)
+HUMIDITY_WIND_FIELDS = ('humidity_avg', 'wind_speed_max')
+
+# Forecast table columns and their display names, in display order
+FORECAST_TABLE_COLUMNS = {
+    'date': 'Date',
+    'temp_min': 'Min Temp (°C)',
+    'temp_max': 'Max Temp (°C)',
+    'temp_avg': 'Avg Temp (°C)',
+    'total_rain': 'Rainfall (mm)',
+    'humidity_avg': 'Humidity (%)',
+    'wind_speed_max': 'Max Wind (km/h)',
+    'description': 'Conditions',
+}
+FORECAST_TABLE_NUMERIC = ['temp_min', 'temp_max', 'temp_avg', 'total_rain', 'humidity_avg', 'wind_speed_max']
+
+
+def _fingerprint(forecast: List[Dict], fields: Tuple[str, ...]) -> Tuple[tuple, ...]:
+    """Reduce a forecast to a hashable tuple of (date, *fields) rows rounded to 1 decimal"""
+    return tuple((f['date'],) + tuple(round(f[k], 1) for k in fields) for f in forecast or ())
+
+
+def _resolve_format(format: Optional[str]) -> str:
+    """The requested chart format, defaulting to PNG only when it is enabled"""
+    if format is None:
+        return 'png' if CONFIG.ENABLE_PNG_CHARTS else 'json'
+    return format
+
+
+@lru_cache(maxsize=128)
+def _render_cached(render: Callable, fields: Tuple[str, ...], rows: Tuple[tuple, ...]) -> str:
+    """
+    Render a chart from fingerprint rows, memoized on the renderer and rows
+    
+    The bound renderer method is part of the key, so each chart type and
+    format is cached separately.
+    """
+    forecast = [dict(zip(fields, values), date=date) for date, *values in rows]
+    return render(forecast)
 
 
 class WeatherVisualizer:
     """Class for creating weather visualizations"""
     
-    def __init__(self):
-        """Initialize visualizer with style settings"""
-        # Set seaborn style
-        sns.set_style("whitegrid")
-        plt.rcParams['figure.figsize'] = (10, 6)
-        plt.rcParams['font.size'] = 10
-    
-    def create_temperature_chart(self, forecast: List[Dict], format='png') -> str:
+    def create_temperature_chart(self, forecast: List[Dict], format: Optional[str] = None) -> str:
         """
         Create temperature trend chart
         
         Args:
             forecast: List of forecast dictionaries
-            format: 'png' for matplotlib or 'html' for plotly
+            format: 'png' for matplotlib or 'json' for a plotly figure
+                (default: 'png' when WEATHER_ENABLE_PNG is set, else 'json')
             
         Returns:
-            Base64 encoded image or HTML string
+            Base64 encoded image or plotly figure JSON string
         """
-        if format == 'html':
-            return self._create_temperature_plotly(forecast)
+        if _resolve_format(format) == 'json':
+            render = self._create_temperature_plotly
         else:
-            return self._create_temperature_matplotlib(forecast)
+            render = self._create_temperature_matplotlib
+        return _render_cached(render, TEMPERATURE_FIELDS, _fingerprint(forecast, TEMPERATURE_FIELDS))
     
     def _create_temperature_matplotlib(self, forecast: List[Dict]) -> str:
         """Create temperature chart using matplotlib"""
-        dates = [f['date'] for f in forecast]
-        temp_max = [f['temp_max'] for f in forecast]
-        temp_min = [f['temp_min'] for f in forecast]
-        temp_avg = [f['temp_avg'] for f in forecast]
-        
-        plt.figure(figsize=(12, 6))
-        plt.plot(dates, temp_max, marker='o', label='Max Temp', color='#ff6b6b', linewidth=2)
-        plt.plot(dates, temp_avg, marker='s', label='Avg Temp', color='#4ecdc4', linewidth=2)
-        plt.plot(dates, temp_min, marker='^', label='Min Temp', color='#45b7d1', linewidth=2)
-        
-        plt.fill_between(dates, temp_min, temp_max, alpha=0.2, color='#4ecdc4')
-        
-        plt.xlabel('Date', fontsize=12, fontweight='bold')
-        plt.ylabel('Temperature (°C)', fontsize=12, fontweight='bold')
-        plt.title('Temperature Forecast', fontsize=14, fontweight='bold')
-        plt.legend(loc='best')
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        return self._fig_to_base64()
+        n = len(forecast)
+        dates = [None] * n
+        temp_max = [0.0] * n
+        temp_min = [0.0] * n
+        temp_avg = [0.0] * n
+        for i, f in enumerate(forecast):
+            dates[i] = f['date']
+            temp_max[i] = f['temp_max']
+            temp_min[i] = f['temp_min']
+            temp_avg[i] = f['temp_avg']
+        
+        fig, ax = _new_figure()
+        ax.plot(dates, temp_max, marker='o', label='Max Temp', color='#ff6b6b', linewidth=2)
+        ax.plot(dates, temp_avg, marker='s', label='Avg Temp', color='#4ecdc4', linewidth=2)
+        ax.plot(dates, temp_min, marker='^', label='Min Temp', color='#45b7d1', linewidth=2)
+        
+        ax.fill_between(dates, temp_min, temp_max, alpha=0.2, color='#4ecdc4')
+        
+        ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Temperature (°C)', fontsize=12, fontweight='bold')
+        ax.set_title('Temperature Forecast', fontsize=14, fontweight='bold')
+        ax.legend(loc='best')
+        ax.tick_params(axis='x', labelrotation=45)
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        
+        return self._fig_to_base64(fig)
     
     def _create_temperature_plotly(self, forecast: List[Dict]) -> str:
         """Create interactive temperature chart using plotly"""
         if not forecast or len(forecast) == 0:
-            return '<div class="alert alert-warning">No forecast data available</div>'
-        
-        dates = [f['date'].strftime('%Y-%m-%d') for f in forecast]
+            return NO_DATA_FIGURE
+        
+        go = _go()
+        # One pass over the forecast instead of one per series
+        n = len(forecast)
+        dates = _format_dates(forecast, '%Y-%m-%d')
+        temp_max = [0.0] * n
+        temp_min = [0.0] * n
+        temp_avg = [0.0] * n
+        for i, f in enumerate(forecast):
+            temp_max[i] = f['temp_max']
+            temp_min[i] = f['temp_min']
+            temp_avg[i] = f['temp_avg']
         
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
-            x=dates, y=[f['temp_max'] for f in forecast],
+            x=dates, y=temp_max,
             name='Max Temperature',
             mode='lines+markers',
             line=dict(color='#ff6b6b', width=3),
@@ -83,7 +208,7 @@ class WeatherVisualizer:
         ))
         
         fig.add_trace(go.Scatter(
-            x=dates, y=[f['temp_avg'] for f in forecast],
+            x=dates, y=temp_avg,
             name='Avg Temperature',
             mode='lines+markers',
             line=dict(color='#4ecdc4', width=3),
@@ -91,7 +216,7 @@ class WeatherVisualizer:
         ))
         
         fig.add_trace(go.Scatter(
-            x=dates, y=[f['temp_min'] for f in forecast],
+            x=dates, y=temp_min,
             name='Min Temperature',
             mode='lines+markers',
             line=dict(color='#45b7d1', width=3),
@@ -108,53 +233,48 @@ class WeatherVisualizer:
             margin=dict(l=50, r=50, t=80, b=50)
         )
         
-        # Use 'cdn' to include Plotly from CDN for reliability
-        config = {'displayModeBar': True, 'responsive': True}
-        html = fig.to_html(
-            full_html=False, 
-            include_plotlyjs='cdn',
-            div_id='temp-chart',
-            config=config
-        )
-        return html
+        # Figure JSON only - the page draws it with Plotly.newPlot
+        return _figure_json(fig)
     
-    def create_rainfall_chart(self, forecast: List[Dict], format='png') -> str:
+    def create_rainfall_chart(self, forecast: List[Dict], format: Optional[str] = None) -> str:
         """Create rainfall comparison chart"""
-        if format == 'html':
-            return self._create_rainfall_plotly(forecast)
+        if _resolve_format(format) == 'json':
+            render = self._create_rainfall_plotly
         else:
-            return self._create_rainfall_matplotlib(forecast)
+            render = self._create_rainfall_matplotlib
+        return _render_cached(render, RAINFALL_FIELDS, _fingerprint(forecast, RAINFALL_FIELDS))
     
     def _create_rainfall_matplotlib(self, forecast: List[Dict]) -> str:
         """Create rainfall bar chart using matplotlib"""
-        dates = [f['date'].strftime('%m/%d') for f in forecast]
+        dates = _format_dates(forecast, '%m/%d')
         rainfall = [f['total_rain'] for f in forecast]
         
-        plt.figure(figsize=(12, 6))
-        bars = plt.bar(dates, rainfall, color='#45b7d1', alpha=0.7, edgecolor='#2c3e50')
+        fig, ax = _new_figure()
+        bars = ax.bar(dates, rainfall, color='#45b7d1', alpha=0.7, edgecolor='#2c3e50')
         
         # Add value labels on bars
         for bar in bars:
             height = bar.get_height()
             if height > 0:
-                plt.text(bar.get_x() + bar.get_width()/2., height,
+                ax.text(bar.get_x() + bar.get_width()/2., height,
                         f'{height:.1f}mm',
                         ha='center', va='bottom', fontsize=9)
         
-        plt.xlabel('Date', fontsize=12, fontweight='bold')
-        plt.ylabel('Rainfall (mm)', fontsize=12, fontweight='bold')
-        plt.title('Rainfall Forecast', fontsize=14, fontweight='bold')
-        plt.grid(True, alpha=0.3, axis='y')
-        plt.tight_layout()
+        ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Rainfall (mm)', fontsize=12, fontweight='bold')
+        ax.set_title('Rainfall Forecast', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3, axis='y')
+        fig.tight_layout()
         
-        return self._fig_to_base64()
+        return self._fig_to_base64(fig)
     
     def _create_rainfall_plotly(self, forecast: List[Dict]) -> str:
         """Create interactive rainfall chart using plotly"""
         if not forecast or len(forecast) == 0:
-            return '<div class="alert alert-warning">No forecast data available</div>'
+            return NO_DATA_FIGURE
         
-        dates = [f['date'].strftime('%Y-%m-%d') for f in forecast]
+        go = _go()
+        dates = _format_dates(forecast, '%Y-%m-%d')
         rainfall = [f['total_rain'] for f in forecast]
         
         fig = go.Figure(data=[
@@ -176,30 +296,27 @@ class WeatherVisualizer:
             margin=dict(l=50, r=50, t=80, b=50)
         )
         
-        # Use 'cdn' to include Plotly from CDN for reliability
-        config = {'displayModeBar': True, 'responsive': True}
-        html = fig.to_html(
-            full_html=False,
-            include_plotlyjs='cdn',
-            div_id='rain-chart',
-            config=config
-        )
-        return html
+        return _figure_json(fig)
     
-    def create_humidity_wind_chart(self, forecast: List[Dict], format='png') -> str:
+    def create_humidity_wind_chart(self, forecast: List[Dict], format: Optional[str] = None) -> str:
         """Create combined humidity and wind speed chart"""
-        if format == 'html':
-            return self._create_humidity_wind_plotly(forecast)
+        if _resolve_format(format) == 'json':
+            render = self._create_humidity_wind_plotly
         else:
-            return self._create_humidity_wind_matplotlib(forecast)
+            render = self._create_humidity_wind_matplotlib
+        return _render_cached(render, HUMIDITY_WIND_FIELDS, _fingerprint(forecast, HUMIDITY_WIND_FIELDS))
     
     def _create_humidity_wind_matplotlib(self, forecast: List[Dict]) -> str:
         """Create dual-axis chart for humidity and wind"""
-        dates = [f['date'].strftime('%m/%d') for f in forecast]
-        humidity = [f['humidity_avg'] for f in forecast]
-        wind = [f['wind_speed_max'] for f in forecast]
+        n = len(forecast)
+        dates = _format_dates(forecast, '%m/%d')
+        humidity = [0.0] * n
+        wind = [0.0] * n
+        for i, f in enumerate(forecast):
+            humidity[i] = f['humidity_avg']
+            wind[i] = f['wind_speed_max']
         
-        fig, ax1 = plt.subplots(figsize=(12, 6))
+        fig, ax1 = _new_figure()
         
         color1 = '#4ecdc4'
         ax1.set_xlabel('Date', fontsize=12, fontweight='bold')
@@ -214,21 +331,28 @@ class WeatherVisualizer:
         ax2.plot(dates, wind, marker='s', color=color2, linewidth=2, label='Wind Speed')
         ax2.tick_params(axis='y', labelcolor=color2)
         
-        plt.title('Humidity and Wind Speed Forecast', fontsize=14, fontweight='bold')
-        plt.xticks(rotation=45)
+        ax1.set_title('Humidity and Wind Speed Forecast', fontsize=14, fontweight='bold')
+        ax1.tick_params(axis='x', labelrotation=45)
         fig.tight_layout()
         
-        return self._fig_to_base64()
+        return self._fig_to_base64(fig)
     
     def _create_humidity_wind_plotly(self, forecast: List[Dict]) -> str:
         """Create interactive dual-axis chart using plotly"""
-        dates = [f['date'].strftime('%Y-%m-%d') for f in forecast]
+        go = _go()
+        n = len(forecast)
+        dates = _format_dates(forecast, '%Y-%m-%d')
+        humidity = [0.0] * n
+        wind = [0.0] * n
+        for i, f in enumerate(forecast):
+            humidity[i] = f['humidity_avg']
+            wind[i] = f['wind_speed_max']
         
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
             x=dates,
-            y=[f['humidity_avg'] for f in forecast],
+            y=humidity,
             name='Humidity',
             yaxis='y',
             mode='lines+markers',
@@ -237,7 +361,7 @@ class WeatherVisualizer:
         
         fig.add_trace(go.Scatter(
             x=dates,
-            y=[f['wind_speed_max'] for f in forecast],
+            y=wind,
             name='Wind Speed',
             yaxis='y2',
             mode='lines+markers',
@@ -255,8 +379,7 @@ class WeatherVisualizer:
             margin=dict(l=50, r=50, t=80, b=50)
         )
         
-        # Return HTML without including plotlyjs (loaded globally in base.html)
-        return fig.to_html(full_html=False, include_plotlyjs=False)
+        return _figure_json(fig)
     
     def create_weather_summary_card(self, weather_data: Dict) -> Dict:
         """
@@ -281,16 +404,16 @@ class WeatherVisualizer:
             'country': weather_data['country']
         }
     
-    def _fig_to_base64(self) -> str:
-        """Convert matplotlib figure to base64 encoded string"""
+    def _fig_to_base64(self, fig) -> str:
+        """Convert a matplotlib figure to a base64 encoded string"""
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
+        fig.canvas.print_png(buffer)
+        # Encode straight from the buffer's memory instead of copying it out
+        with buffer.getbuffer() as png:
+            image_base64 = base64.b64encode(png).decode('ascii')
         return f"data:image/png;base64,{image_base64}"
     
-    def create_forecast_table(self, forecast: List[Dict]) -> pd.DataFrame:
+    def create_forecast_table(self, forecast: List[Dict]) -> 'pd.DataFrame':
         """
         Create a pandas DataFrame from forecast data
         
@@ -298,19 +421,13 @@ class WeatherVisualizer:
             forecast: List of forecast dictionaries
             
         Returns:
-            DataFrame with formatted forecast data
+            DataFrame with formatted dates and conditions, and numeric
+            columns rounded to 1 decimal
         """
-        data = []
-        for f in forecast:
-            data.append({
-                'Date': f['date'].strftime('%Y-%m-%d'),
-                'Min Temp (°C)': f'{f["temp_min"]:.1f}',
-                'Max Temp (°C)': f'{f["temp_max"]:.1f}',
-                'Avg Temp (°C)': f'{f["temp_avg"]:.1f}',
-                'Rainfall (mm)': f'{f["total_rain"]:.1f}',
-                'Humidity (%)': f'{f["humidity_avg"]:.1f}',
-                'Max Wind (km/h)': f'{f["wind_speed_max"]:.1f}',
-                'Conditions': f['description'].title()
-            })
-        
-        return pd.DataFrame(data)
+        pd = _pd()
+        df = pd.DataFrame(forecast, columns=list(FORECAST_TABLE_COLUMNS))
+        df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+        df['description'] = df['description'].str.title()
+        df[FORECAST_TABLE_NUMERIC] = df[FORECAST_TABLE_NUMERIC].round(1)
+        
+        return df.rename(columns=FORECAST_TABLE_COLUMNS)
\ No newline at end of file
@@ -3,10 +3,284 @@ Weather Data Integration Module
 Handles API calls to OpenWeatherMap and data parsing
 """
 import requests
-import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from config import Config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import copy
+import math
+import queue
+import re
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import partial
+from itertools import groupby, islice
+from types import MappingProxyType
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
+from cache import MemoryCache, SingleFlight, coord_key
+from config import CONFIG
+
+# Bodies are decoded whole rather than streamed: they are capped at
+# OWM_MAX_RESPONSE_BYTES and already in memory, and for a ~20 kB forecast
+# orjson.loads is several times faster than walking it with ijson
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional here - parse with the stdlib instead
+    from json import loads as _json_loads
+
+try:
+    import httpx
+except ImportError:  # httpx is optional - only AsyncWeatherService needs it
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - lets httpx speak HTTP/2
+    _HTTP2 = True
+except ImportError:  # h2 is optional - AsyncWeatherService stays on HTTP/1.1
+    _HTTP2 = False
+
+try:
+    import brotli  # noqa: F401 - installed alongside flask-compress; lets urllib3/httpx decode br
+    _ACCEPT_ENCODING = 'br, gzip'
+except ImportError:  # brotli is optional - ask for gzip only
+    _ACCEPT_ENCODING = 'gzip'
+
+OWM_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': _ACCEPT_ENCODING,
+    'User-Agent': 'smart_weather_app',
+}
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Unit conversions and the timestamp constructor, bound once for the parsers
+_MS_TO_KMH = 3.6
+_M_PER_KM = 1000
+_FROM_TS = datetime.fromtimestamp
+
+# Shared read-only default for the optional rain/snow blocks, instead of a
+# fresh {} per lookup
+_EMPTY = MappingProxyType({})
+
+# Most city IDs the OpenWeatherMap group endpoint accepts per call
+OWM_GROUP_MAX_IDS = 20
+
+class WeatherServiceError(Exception):
+    """An OpenWeatherMap request failed (network error or undecodable response)"""
+
+
+class InvalidAPIKey(WeatherServiceError):
+    """OpenWeatherMap rejected the API key (HTTP 401)"""
+
+
+class LocationNotFound(WeatherServiceError):
+    """OpenWeatherMap has no data for the requested place (HTTP 404)"""
+
+
+class UpstreamHTTPError(WeatherServiceError):
+    """OpenWeatherMap answered with another error status or an API error payload"""
+
+
+def _status_error(status_code: int, error: Exception) -> WeatherServiceError:
+    """Normalized exception for an OpenWeatherMap HTTP error status"""
+    if status_code == 401:
+        return InvalidAPIKey("Invalid API key. Please check your OPENWEATHER_API_KEY in .env file")
+    if status_code == 404:
+        return LocationNotFound("Location not found")
+    return UpstreamHTTPError(f"HTTP Error {status_code}: {str(error)}")
+
+
+def _check_api_error(data: Dict):
+    """Raise for an error payload delivered with a 200 status"""
+    if 'cod' in data and str(data['cod']) != '200':
+        raise UpstreamHTTPError(f"API Error: {data.get('message', 'Unknown error')}")
+
+
+def _utc_day(item: Dict) -> int:
+    """UTC day index of a forecast slot"""
+    return item['dt'] // 86400
+
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+# How long results carrying an ETag/Last-Modified are kept past their
+# freshness, so the next refresh can be a conditional request
+_REVALIDATE_WINDOW = 86400  # s
+
+
+def _max_age(response) -> Optional[int]:
+    """Return the Cache-Control max-age of an upstream response, if any"""
+    match = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+    return int(match.group(1)) if match else None
+
+
+_MAIN_GETTER = itemgetter('temp', 'feels_like', 'temp_min', 'temp_max', 'pressure', 'humidity')
+_WEATHER_GETTER = itemgetter('description', 'main', 'icon')
+_SYS_GETTER = itemgetter('sunrise', 'sunset', 'country')
+_COORD_GETTER = itemgetter('lat', 'lon')
+
+
+@dataclass(slots=True)
+class CurrentWeather(Mapping):
+    """
+    Current weather for a location
+    
+    Slotted rather than a dict so the entries held by the TTL caches stay
+    small. Also a read/write Mapping over its fields (weather['temperature'],
+    .get(), item assignment, dict(weather)), so it drops in wherever the
+    dict was used. Times are Unix seconds; timestamp_dt converts the
+    observation time for callers that need a datetime.
+    """
+    temperature: float
+    feels_like: float
+    temp_min: float
+    temp_max: float
+    pressure: int
+    humidity: int
+    wind_speed: float       # km/h
+    wind_direction: int
+    clouds: int
+    description: str
+    main: str
+    icon: str
+    visibility: float       # km
+    rain_1h: float
+    rain_3h: float
+    rain_total: float
+    snow_1h: float
+    timestamp: int
+    sunrise: int
+    sunset: int
+    city: str
+    country: str
+    coordinates: Dict[str, float]
+    
+    def __getitem__(self, key: str):
+        if key not in _CURRENT_FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value):
+        if key not in _CURRENT_FIELD_NAMES:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key) -> bool:
+        return key in _CURRENT_FIELD_NAMES
+    
+    def __iter__(self):
+        return iter(_CURRENT_FIELD_NAMES)
+    
+    def __len__(self) -> int:
+        return len(_CURRENT_FIELD_NAMES)
+    
+    @property
+    def timestamp_dt(self) -> datetime:
+        """Observation time as a local datetime"""
+        return _FROM_TS(self.timestamp)
+    
+    def to_dict(self) -> Dict:
+        """Fields as a plain dict, in declaration order"""
+        return {name: getattr(self, name) for name in _CURRENT_FIELD_NAMES}
+
+
+_CURRENT_FIELD_NAMES = tuple(f.name for f in fields(CurrentWeather))
+
+
+class _CurrentWeatherBatcher:
+    """
+    Micro-batches current weather lookups
+    
+    Requests arriving within `window` seconds of each other (up to `max_size`)
+    are flushed together: duplicate points are fetched once and the distinct
+    points are fetched in parallel, each waiter getting its own copy.
+    """
+    
+    def __init__(self, fetch, window: float, max_size: int):
+        """Start the background flusher"""
+        self._fetch = fetch
+        self._window = window
+        self._max_size = max_size
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_size, thread_name_prefix='owm-batch')
+        self._closed = False
+        # Orders every enqueue against the shutdown sentinel
+        self._lock = threading.Lock()
+        threading.Thread(target=self._flusher, name='owm-batch-flusher', daemon=True).start()
+    
+    def submit(self, lat: float, lon: float) -> Future:
+        """Queue a lookup and return a future for its result"""
+        future = Future()
+        with self._lock:
+            if not self._closed:
+                self._queue.put((lat, lon, future))
+                return future
+        future.set_exception(WeatherServiceError("Weather service is closed"))
+        return future
+    
+    def shutdown(self):
+        """Stop the flusher and its fetch workers once queued lookups are dispatched"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+    
+    def _flusher(self):
+        """Collect windows of queued lookups and dispatch them, until shut down"""
+        try:
+            self._flush_until_shutdown()
+        finally:
+            # In-flight fetches still finish; the idle workers exit
+            self._executor.shutdown(wait=False)
+    
+    def _flush_until_shutdown(self):
+        """Dispatch batches until the shutdown sentinel is dequeued"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._dispatch(batch)
+                    return
+                batch.append(item)
+            self._dispatch(batch)
+    
+    def _dispatch(self, batch: List):
+        """Fetch each distinct point of a batch in parallel"""
+        groups = {}
+        for lat, lon, future in batch:
+            groups.setdefault(coord_key(lat, lon), []).append(future)
+        
+        for lat, lon, _ in batch:
+            waiters = groups.pop(coord_key(lat, lon), None)
+            if waiters:
+                fetch = self._executor.submit(self._fetch, lat, lon)
+                fetch.add_done_callback(partial(self._resolve, waiters))
+    
+    @staticmethod
+    def _resolve(waiters: List[Future], fetch: Future):
+        """Hand a finished fetch to every waiter of its point"""
+        error = fetch.exception()
+        for i, future in enumerate(waiters):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(fetch.result() if i == 0 else copy.deepcopy(fetch.result()))
 
 
 class WeatherService:
@@ -14,13 +288,175 @@ class WeatherService:
     
     def __init__(self, api_key: Optional[str] = None):
         """Initialize weather service with API key"""
-        self.api_key = api_key or Config.OPENWEATHER_API_KEY
+        self.api_key = api_key or CONFIG.OPENWEATHER_API_KEY
         if not self.api_key:
             print("WARNING: OpenWeatherMap API key is not set. Please set OPENWEATHER_API_KEY in .env file")
             print("Get your free API key at: https://openweathermap.org/api")
         else:
             print(f"Weather service initialized with API key: {self.api_key[:8]}...")
         
+        # Endpoint URLs, resolved once rather than on every request
+        self._current_url = f"{CONFIG.OPENWEATHER_BASE_URL}/weather"
+        self._forecast_url = CONFIG.OPENWEATHER_FORECAST_URL
+        self._air_url = f"{CONFIG.OPENWEATHER_BASE_URL}/air_pollution"
+        self._group_url = f"{CONFIG.OPENWEATHER_BASE_URL}/group"
+        
+        # Pooled keep-alive connections, reused across calls. Transient
+        # upstream failures are retried briefly; the final response is
+        # returned as-is so raise_for_status() still reports it
+        self._session = requests.Session()
+        self._session.headers.update(OWM_HEADERS)
+        retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504],
+                        respect_retry_after_header=False, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        # Identical concurrent requests share one upstream call
+        self._inflight = SingleFlight()
+        
+        # Parsed results per grid cell, so repeat lookups within OpenWeather's
+        # update interval skip the network entirely
+        self._cache = MemoryCache(maxsize=1024)
+        
+        # Caps concurrent OpenWeatherMap requests so bursts queue briefly
+        # instead of piling up against the upstream rate limit
+        self._owm_slots = threading.BoundedSemaphore(CONFIG.OWM_MAX_CONCURRENCY)
+        
+        # Runs the two halves of get_current_and_air side by side
+        self._pair_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='owm-pair')
+        
+        # Micro-batcher for get_current_weather_batched, started on first use
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+    
+    def close(self):
+        """Close the pooled upstream connections"""
+        self._pair_executor.shutdown(wait=False)
+        if self._batcher is not None:
+            self._batcher.shutdown()
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _cache_get(self, key: str):
+        """Return a copy of the fresh cached result for key, or None"""
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return copy.deepcopy(entry[1])
+    
+    def _cache_put(self, key: str, value, response: requests.Response, ttl_name: str):
+        """Cache value for the response's max-age, else the configured TTL"""
+        ttl = _max_age(response)
+        if ttl is None:
+            ttl = CONFIG.CACHE_TTLS[ttl_name]
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        keep = max(ttl, _REVALIDATE_WINDOW) if etag or last_modified else ttl
+        if keep > 0:
+            entry = (time.monotonic() + ttl, copy.deepcopy(value), etag, last_modified)
+            self._cache.set(key, entry, keep)
+    
+    def _get_revalidated(self, key: str, url: str,
+                         params: Dict) -> Tuple[requests.Response, bytes, Optional[Dict]]:
+        """
+        GET an OpenWeatherMap URL, conditionally when a stale result for key
+        has validators
+        
+        Returns:
+            Tuple of (response, body, copy of the stored result if the
+            upstream answered 304 Not Modified, else None)
+        """
+        entry = self._cache.get(key)
+        headers = {}
+        if entry is not None:
+            _, _, etag, last_modified = entry
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response, body = self._get(url, params, headers)
+        if response.status_code == 304 and entry is not None:
+            # A 304 need not repeat the validators; keep the stored ones
+            if etag:
+                response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', last_modified)
+            return response, body, copy.deepcopy(entry[1])
+        return response, body, None
+    
+    def _get(self, url: str, params: Dict,
+             headers: Optional[Dict] = None) -> Tuple[requests.Response, bytes]:
+        """
+        GET an OpenWeatherMap URL within the concurrency limit
+        
+        Returns:
+            Tuple of (response, body); the body is read in full here since
+            the response is streamed and closed before returning
+        """
+        # Wait for a slot no longer than a request may take to respond
+        if not self._owm_slots.acquire(timeout=CONFIG.UPSTREAM_TIMEOUT[1]):
+            raise WeatherServiceError("Too many concurrent requests to OpenWeatherMap. Please try again shortly")
+        try:
+            # Stream the body so an oversized payload is cut off at the cap
+            # instead of being inflated and decoded in full
+            response = self._session.get(url, params=params, headers=headers,
+                                         timeout=CONFIG.UPSTREAM_TIMEOUT, stream=True)
+            with response:
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=65536):
+                    body += chunk
+                    if len(body) > CONFIG.OWM_MAX_RESPONSE_BYTES:
+                        raise ValueError(f"Response larger than {CONFIG.OWM_MAX_RESPONSE_BYTES} bytes")
+        finally:
+            self._owm_slots.release()
+        
+        return response, bytes(body)
+    
+    def _request(self, url: str, params: Dict, what: str, parse: Callable,
+                 key: Optional[str] = None, ttl_name: Optional[str] = None):
+        """
+        GET an OpenWeatherMap URL and parse the decoded JSON body
+        
+        Retries of transient failures happen in the session's adapter; this
+        maps what is left onto InvalidAPIKey / LocationNotFound /
+        UpstreamHTTPError / WeatherServiceError. With a cache key the
+        request is conditional on a stale stored result, and the parsed
+        result is cached under ttl_name.
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            what: What is being fetched, for error messages
+            parse: Function turning the decoded JSON into the result
+            key: Optional service cache key
+            ttl_name: CONFIG.CACHE_TTLS entry for the cached result
+        """
+        try:
+            if key is None:
+                (response, body), result = self._get(url, params), None
+            else:
+                response, body, result = self._get_revalidated(key, url, params)
+            if result is None:
+                response.raise_for_status()
+                data = _json_loads(body)
+                _check_api_error(data)
+                result = parse(data)
+        except requests.exceptions.HTTPError as e:
+            raise _status_error(e.response.status_code, e) from e
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise WeatherServiceError(f"Failed to fetch {what}: {str(e)}") from e
+        
+        if key is not None and result is not None:
+            self._cache_put(key, result, response, ttl_name)
+        return result
+    
     def get_current_weather(self, lat: float, lon: float) -> Dict:
         """
         Get current weather data for a location
@@ -32,35 +468,61 @@ class WeatherService:
         Returns:
             Dictionary containing current weather data
         """
-        url = f"{Config.OPENWEATHER_BASE_URL}/weather"
-        params = {
-            'lat': lat,
-            'lon': lon,
-            'appid': self.api_key,
-            'units': 'metric'
-        }
+        key = f"current:{coord_key(lat, lon)}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        return self._inflight.do(key, self._fetch_current_weather, lat, lon)
+    
+    def _fetch_current_weather(self, lat: float, lon: float) -> Dict:
+        """Fetch current weather from OpenWeatherMap"""
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key, 'units': 'metric'}
+        return self._request(self._current_url, params, 'current weather',
+                             self._parse_current_weather, f"current:{coord_key(lat, lon)}", 'current_weather')
+    
+    def get_current_and_air(self, lat: float, lon: float) -> Dict:
+        """
+        Get current weather and air quality for a location concurrently
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+        Args:
+            lat: Latitude
+            lon: Longitude
             
-            # Check for API errors
-            if 'cod' in data and data['cod'] != 200:
-                raise Exception(f"API Error: {data.get('message', 'Unknown error')}")
+        Returns:
+            Dictionary with 'current' (current weather) and 'air' (air
+            quality, or None if unavailable)
+        """
+        air = self._pair_executor.submit(self.get_air_quality, lat, lon)
+        current = self.get_current_weather(lat, lon)
+        return {'current': current, 'air': air.result()}
+    
+    def get_current_weather_batched(self, lat: float, lon: float) -> Dict:
+        """
+        Get current weather, grouping the upstream call with other lookups
+        made within CONFIG.OWM_BATCH_WINDOW_MS
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
             
-            return self._parse_current_weather(data)
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                raise Exception("Invalid API key. Please check your OPENWEATHER_API_KEY in .env file")
-            elif e.response.status_code == 404:
-                raise Exception("Location not found")
-            else:
-                raise Exception(f"HTTP Error {e.response.status_code}: {str(e)}")
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to fetch current weather: {str(e)}")
+        Returns:
+            Dictionary containing current weather data
+        """
+        cached = self._cache_get(f"current:{coord_key(lat, lon)}")
+        if cached is not None:
+            return cached
+        if self._batcher is None:
+            with self._batcher_lock:
+                if self._batcher is None:
+                    self._batcher = _CurrentWeatherBatcher(
+                        self._fetch_current_weather,
+                        window=CONFIG.OWM_BATCH_WINDOW_MS / 1000,
+                        max_size=CONFIG.OWM_BATCH_MAX_SIZE
+                    )
+        return self._batcher.submit(lat, lon).result()
     
-    def get_forecast(self, lat: float, lon: float, days: int = 5) -> List[Dict]:
+    def get_forecast(self, lat: float, lon: float, days: int = 5,
+                     include_details: bool = False) -> List[Dict]:
         """
         Get weather forecast for a location
         
@@ -68,37 +530,28 @@ class WeatherService:
             lat: Latitude
             lon: Longitude
             days: Number of days to forecast (default 5)
+            include_details: Also return each day's 3-hourly slots
             
         Returns:
             List of daily forecast dictionaries
         """
-        url = Config.OPENWEATHER_FORECAST_URL
-        params = {
-            'lat': lat,
-            'lon': lon,
-            'appid': self.api_key,
-            'units': 'metric'
-        }
-        
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Check for API errors
-            if 'cod' in data and str(data['cod']) != '200':
-                raise Exception(f"API Error: {data.get('message', 'Unknown error')}")
-            
-            return self._parse_forecast(data, days)
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
-                raise Exception("Invalid API key. Please check your OPENWEATHER_API_KEY in .env file")
-            elif e.response.status_code == 404:
-                raise Exception("Location not found")
-            else:
-                raise Exception(f"HTTP Error {e.response.status_code}: {str(e)}")
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to fetch forecast: {str(e)}")
+        key = self._forecast_key(lat, lon, days, include_details)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        return self._inflight.do(key, self._fetch_forecast, lat, lon, days, include_details)
+    
+    @staticmethod
+    def _forecast_key(lat: float, lon: float, days: int, include_details: bool) -> str:
+        return f"forecast:{coord_key(lat, lon)}:{days}{':details' if include_details else ''}"
+    
+    def _fetch_forecast(self, lat: float, lon: float, days: int,
+                        include_details: bool = False) -> List[Dict]:
+        """Fetch and aggregate the forecast from OpenWeatherMap"""
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key, 'units': 'metric'}
+        return self._request(self._forecast_url, params, 'forecast',
+                             partial(self._parse_forecast, days=days, include_details=include_details),
+                             self._forecast_key(lat, lon, days, include_details), 'forecast')
     
     def get_weather_by_city(self, city: str) -> Dict:
         """
@@ -110,99 +563,145 @@ class WeatherService:
         Returns:
             Dictionary containing weather data
         """
-        url = f"{Config.OPENWEATHER_BASE_URL}/weather"
-        params = {
-            'q': city,
-            'appid': self.api_key,
-            'units': 'metric'
-        }
+        key = f"city:{city.strip().lower()}"
+        return self._inflight.do(key, self._fetch_weather_by_city, city)
+    
+    def _fetch_weather_by_city(self, city: str) -> Dict:
+        """Fetch current weather by city name from OpenWeatherMap"""
+        params = {'q': city, 'appid': self.api_key, 'units': 'metric'}
+        return self._request(self._current_url, params, f"weather for {city}",
+                             self._parse_current_weather)
+    
+    def get_weather_for_cities(self, city_ids: List[int]) -> List[Dict]:
+        """
+        Get current weather for several cities, up to 20 per upstream call
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+        Args:
+            city_ids: OpenWeatherMap city IDs
             
-            return self._parse_current_weather(data)
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to fetch weather for {city}: {str(e)}")
+        Returns:
+            List of current weather dictionaries, in response order
+        """
+        results = []
+        for start in range(0, len(city_ids), OWM_GROUP_MAX_IDS):
+            results.extend(self._fetch_weather_group(city_ids[start:start + OWM_GROUP_MAX_IDS]))
+        return results
+    
+    def _fetch_weather_group(self, city_ids: List[int]) -> List[Dict]:
+        """Fetch current weather for up to 20 city IDs from the group endpoint"""
+        params = {'id': ','.join(map(str, city_ids)), 'appid': self.api_key, 'units': 'metric'}
+        return self._request(self._group_url, params, 'weather for cities',
+                             self._parse_weather_group)
     
-    def _parse_current_weather(self, data: Dict) -> Dict:
+    @staticmethod
+    def _parse_current_weather(data: Dict) -> CurrentWeather:
         """Parse OpenWeatherMap current weather response"""
-        return {
-            'temperature': data['main']['temp'],
-            'feels_like': data['main']['feels_like'],
-            'temp_min': data['main']['temp_min'],
-            'temp_max': data['main']['temp_max'],
-            'pressure': data['main']['pressure'],
-            'humidity': data['main']['humidity'],
-            'wind_speed': data['wind']['speed'] * 3.6,  # Convert m/s to km/h
-            'wind_direction': data['wind'].get('deg', 0),
-            'clouds': data['clouds']['all'],
-            'description': data['weather'][0]['description'],
-            'main': data['weather'][0]['main'],
-            'icon': data['weather'][0]['icon'],
-            'visibility': data.get('visibility', 0) / 1000,  # Convert to km
-            'rain_1h': data.get('rain', {}).get('1h', 0),
-            'rain_3h': data.get('rain', {}).get('3h', 0),
-            'snow_1h': data.get('snow', {}).get('1h', 0),
-            'timestamp': datetime.fromtimestamp(data['dt']),
-            'sunrise': datetime.fromtimestamp(data['sys']['sunrise']),
-            'sunset': datetime.fromtimestamp(data['sys']['sunset']),
-            'city': data['name'],
-            'country': data['sys']['country'],
-            'coordinates': {
-                'lat': data['coord']['lat'],
-                'lon': data['coord']['lon']
-            }
-        }
+        temp, feels_like, temp_min, temp_max, pressure, humidity = _MAIN_GETTER(data['main'])
+        description, main, icon = _WEATHER_GETTER(data['weather'][0])
+        sunrise, sunset, country = _SYS_GETTER(data['sys'])
+        lat, lon = _COORD_GETTER(data['coord'])
+        wind = data['wind']
+        rain = data.get('rain', _EMPTY)
+        rain_1h = rain.get('1h', 0)
+        rain_3h = rain.get('3h', 0)
+        return CurrentWeather(
+            temperature=temp,
+            feels_like=feels_like,
+            temp_min=temp_min,
+            temp_max=temp_max,
+            pressure=pressure,
+            humidity=humidity,
+            wind_speed=wind['speed'] * _MS_TO_KMH,
+            wind_direction=wind.get('deg', 0),
+            clouds=data['clouds']['all'],
+            description=description,
+            main=main,
+            icon=icon,
+            visibility=data.get('visibility', 0) / _M_PER_KM,
+            rain_1h=rain_1h,
+            rain_3h=rain_3h,
+            rain_total=rain_1h + rain_3h,
+            snow_1h=data.get('snow', _EMPTY).get('1h', 0),
+            timestamp=data['dt'],
+            sunrise=sunrise,
+            sunset=sunset,
+            city=data['name'],
+            country=country,
+            coordinates={'lat': lat, 'lon': lon},
+        )
     
-    def _parse_forecast(self, data: Dict, days: int) -> List[Dict]:
+    @staticmethod
+    def _parse_weather_group(data: Dict) -> List[CurrentWeather]:
+        """Parse OpenWeatherMap group (several cities) response"""
+        return [WeatherService._parse_current_weather(entry) for entry in data['list']]
+    
+    @staticmethod
+    def _parse_forecast(data: Dict, days: int, include_details: bool = False) -> List[Dict]:
         """Parse OpenWeatherMap forecast response"""
+        # OpenWeatherMap returns the slots in chronological order, so each UTC
+        # day is one consecutive run; aggregate each in a single pass
         forecasts = []
-        daily_data = {}
-        
-        # Group by date
-        for item in data['list']:
-            dt = datetime.fromtimestamp(item['dt'])
-            date = dt.date()
-            
-            if date not in daily_data:
-                daily_data[date] = []
+        for day, group in islice(groupby(data['list'], key=_utc_day), max(days, 0)):
+            items = list(group)
+            temp_min, temp_max = math.inf, -math.inf
+            temp_sum = humidity_sum = wind_max = rain_sum = snow_sum = 0.0
+            for item in items:
+                main = item['main']
+                temp = main['temp']
+                if temp < temp_min:
+                    temp_min = temp
+                if temp > temp_max:
+                    temp_max = temp
+                temp_sum += temp
+                humidity_sum += main['humidity']
+                wind = item['wind']['speed']
+                if wind > wind_max:
+                    wind_max = wind
+                if 'rain' in item:
+                    rain_sum += item['rain'].get('3h', 0)
+                if 'snow' in item:
+                    snow_sum += item['snow'].get('3h', 0)
             
-            daily_data[date].append({
-                'datetime': dt,
-                'temperature': item['main']['temp'],
-                'feels_like': item['main']['feels_like'],
-                'humidity': item['main']['humidity'],
-                'pressure': item['main']['pressure'],
-                'wind_speed': item['wind']['speed'] * 3.6,
-                'description': item['weather'][0]['description'],
-                'main': item['weather'][0]['main'],
-                'icon': item['weather'][0]['icon'],
-                'clouds': item['clouds']['all'],
-                'rain': item.get('rain', {}).get('3h', 0),
-                'snow': item.get('snow', {}).get('3h', 0),
-            })
-        
-        # Aggregate daily data
-        for date, items in sorted(daily_data.items())[:days]:
-            temps = [i['temperature'] for i in items]
-            forecasts.append({
-                'date': date,
-                'temp_min': min(temps),
-                'temp_max': max(temps),
-                'temp_avg': sum(temps) / len(temps),
-                'humidity_avg': sum(i['humidity'] for i in items) / len(items),
-                'wind_speed_max': max(i['wind_speed'] for i in items),
-                'total_rain': sum(i['rain'] for i in items),
-                'total_snow': sum(i['snow'] for i in items),
-                'description': items[len(items)//2]['description'],  # Mid-day description
-                'icon': items[len(items)//2]['icon'],
-                'details': items
-            })
+            count = len(items)
+            mid = items[count // 2]['weather'][0]  # Mid-day description
+            forecast = {
+                'date': date.fromordinal(_EPOCH_ORDINAL + day),
+                'temp_min': temp_min,
+                'temp_max': temp_max,
+                'temp_avg': temp_sum / count,
+                'humidity_avg': humidity_sum / count,
+                'wind_speed_max': wind_max * _MS_TO_KMH,
+                'total_rain': rain_sum,
+                'total_snow': snow_sum,
+                'description': mid['description'],
+                'icon': mid['icon'],
+            }
+            if include_details:
+                forecast['details'] = [WeatherService._parse_forecast_slot(item) for item in items]
+            forecasts.append(forecast)
         
         return forecasts
     
+    @staticmethod
+    def _parse_forecast_slot(item: Dict) -> Dict:
+        """Parse one 3-hourly forecast slot"""
+        main = item['main']
+        weather = item['weather'][0]
+        return {
+            'datetime': _FROM_TS(item['dt']),
+            'temperature': main['temp'],
+            'feels_like': main['feels_like'],
+            'humidity': main['humidity'],
+            'pressure': main['pressure'],
+            'wind_speed': item['wind']['speed'] * _MS_TO_KMH,
+            'description': weather['description'],
+            'main': weather['main'],
+            'icon': weather['icon'],
+            'clouds': item['clouds']['all'],
+            'rain': item.get('rain', _EMPTY).get('3h', 0),
+            'snow': item.get('snow', _EMPTY).get('3h', 0),
+        }
+    
     def get_uv_index(self, lat: float, lon: float) -> Optional[float]:
         """
         Get UV index for a location (requires One Call API)
@@ -216,24 +715,132 @@ class WeatherService:
         """
         Get air quality data for a location
         """
-        url = f"{Config.OPENWEATHER_BASE_URL}/air_pollution"
-        params = {
-            'lat': lat,
-            'lon': lon,
-            'appid': self.api_key
+        key = f"air:{coord_key(lat, lon)}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key}
+        try:
+            return self._request(self._air_url, params, 'air quality',
+                                 self._parse_air_quality, key, 'air_quality')
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _parse_air_quality(data: Dict) -> Optional[Dict]:
+        """Parse OpenWeatherMap air pollution response"""
+        if not data['list']:
+            return None
+        aqi_data = data['list'][0]
+        return {
+            'aqi': aqi_data['main']['aqi'],  # 1-5 scale
+            'components': aqi_data['components'],
+            'timestamp': _FROM_TS(aqi_data['dt'])
         }
+
+
+class AsyncWeatherService:
+    """
+    asyncio counterpart of WeatherService built on httpx
+    
+    For async callers that need several independent lookups for one place:
+    bundle() runs current weather, forecast and air quality concurrently,
+    so the three round trips overlap instead of adding up. Results have the
+    same shape as WeatherService's.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None):
+        """Initialize the service and its pooled HTTP client"""
+        if httpx is None:
+            raise ImportError("AsyncWeatherService requires the httpx package (pip install httpx)")
+        
+        self.api_key = api_key or CONFIG.OPENWEATHER_API_KEY
+        self._current_url = f"{CONFIG.OPENWEATHER_BASE_URL}/weather"
+        self._forecast_url = CONFIG.OPENWEATHER_FORECAST_URL
+        self._air_url = f"{CONFIG.OPENWEATHER_BASE_URL}/air_pollution"
+        self._group_url = f"{CONFIG.OPENWEATHER_BASE_URL}/group"
         
+        connect_timeout, read_timeout = CONFIG.UPSTREAM_TIMEOUT
+        # Over HTTP/2 concurrent lookups (bundle(), city groups) multiplex on
+        # one connection to api.openweathermap.org
+        self._client = httpx.AsyncClient(
+            http2=_HTTP2,
+            headers=OWM_HEADERS,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+        # Same upstream concurrency cap as the synchronous service
+        self._owm_slots = asyncio.Semaphore(CONFIG.OWM_MAX_CONCURRENCY)
+    
+    async def aclose(self):
+        """Close the pooled upstream connections"""
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+    
+    async def _get_json(self, url: str, params: Dict, what: str) -> Dict:
+        """GET an OpenWeatherMap URL and decode it, raising the same errors as WeatherService"""
         try:
-            response = requests.get(url, params=params, timeout=10)
+            async with self._owm_slots:
+                response = await self._client.get(url, params=params)
             response.raise_for_status()
-            data = response.json()
-            
-            if data['list']:
-                aqi_data = data['list'][0]
-                return {
-                    'aqi': aqi_data['main']['aqi'],  # 1-5 scale
-                    'components': aqi_data['components'],
-                    'timestamp': datetime.fromtimestamp(aqi_data['dt'])
-                }
+            data = _json_loads(response.content)
+        except httpx.HTTPStatusError as e:
+            raise _status_error(e.response.status_code, e) from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise WeatherServiceError(f"Failed to fetch {what}: {str(e)}") from e
+        
+        _check_api_error(data)
+        return data
+    
+    async def get_current_weather(self, lat: float, lon: float) -> Dict:
+        """Get current weather data for a location"""
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key, 'units': 'metric'}
+        data = await self._get_json(self._current_url, params, 'current weather')
+        return WeatherService._parse_current_weather(data)
+    
+    async def get_forecast(self, lat: float, lon: float, days: int = 5,
+                           include_details: bool = False) -> List[Dict]:
+        """Get the daily weather forecast for a location"""
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key, 'units': 'metric'}
+        data = await self._get_json(self._forecast_url, params, 'forecast')
+        return WeatherService._parse_forecast(data, days, include_details)
+    
+    async def get_air_quality(self, lat: float, lon: float) -> Optional[Dict]:
+        """Get air quality data for a location, or None if unavailable"""
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key}
+        try:
+            data = await self._get_json(self._air_url, params, 'air quality')
+            return WeatherService._parse_air_quality(data)
         except Exception:
             return None
+    
+    async def get_weather_for_cities(self, city_ids: List[int]) -> List[Dict]:
+        """Get current weather for several cities, all group calls in flight at once"""
+        chunks = [city_ids[start:start + OWM_GROUP_MAX_IDS]
+                  for start in range(0, len(city_ids), OWM_GROUP_MAX_IDS)]
+        groups = await asyncio.gather(*(
+            self._get_json(self._group_url,
+                           {'id': ','.join(map(str, chunk)), 'appid': self.api_key, 'units': 'metric'},
+                           'weather for cities')
+            for chunk in chunks
+        ))
+        return [weather for data in groups for weather in WeatherService._parse_weather_group(data)]
+    
+    async def bundle(self, lat: float, lon: float, days: int = 5) -> Tuple[Dict, List[Dict], Optional[Dict]]:
+        """
+        Fetch current weather, forecast and air quality concurrently
+        
+        Returns:
+            Tuple of (current weather, forecast, air quality)
+        """
+        return tuple(await asyncio.gather(
+            self.get_current_weather(lat, lon),
+            self.get_forecast(lat, lon, days),
+            self.get_air_quality(lat, lon)
+        ))